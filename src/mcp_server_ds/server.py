@@ -1,6 +1,32 @@
 from enum import Enum
+import ast
+import asyncio
+import bz2
+import collections
+import concurrent.futures
+import copy
+import ctypes
+import functools
+import glob
+import gzip
+import hashlib
+import itertools
+import json
 import logging
-from typing import Optional, List
+import lzma
+import multiprocessing
+import os
+import pickle
+import re
+import signal
+import threading
+import time
+import warnings
+import weakref
+import zipfile
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Optional, List
 
 ## import mcp server
 from mcp.server.models import InitializationOptions
@@ -12,6 +38,7 @@
     Prompt,
     PromptArgument,
     EmbeddedResource,
+    ErrorData,
     GetPromptResult,
     PromptMessage,
 )
@@ -23,183 +50,2911 @@
 
 ## import common data analysis libraries
 import pandas as pd
+from pandas.tseries.api import guess_datetime_format
 import numpy as np
+import pyarrow as pa
+import pyarrow.feather
 import scipy
 import sklearn
 import statsmodels.api as sm
-from io import StringIO
+from io import BufferedReader, BytesIO, RawIOBase, StringIO
 import sys
 
+# scripts get shallow copies of the stored dataframes; with copy-on-write a script that
+# modifies one in place copies only the columns it writes, leaving the stored frame as it was
+pd.set_option("mode.copy_on_write", True)
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+try:
+    import zstandard
+except ImportError:  # only needed for .zst files
+    zstandard = None
+
 
 logger = logging.getLogger(__name__)
 logger.info("Starting mini data science exploration server")
 
-### Prompt templates
-class DataExplorationPrompts(str, Enum):
-    EXPLORE_DATA = "explore-data"
+### Prompt templates
+class DataExplorationPrompts(str, Enum):
+    EXPLORE_DATA = "explore-data"
+
+class PromptArgs(str, Enum):
+    CSV_PATH = "csv_path"
+    TOPIC = "topic"
+
+PROMPT_TEMPLATE = """
+You are a professional Data Scientist tasked with performing exploratory data analysis on a dataset. Your goal is to provide insightful analysis while ensuring stability and manageable result sizes.
+
+First, load the CSV file from the following path:
+
+<csv_path>
+{csv_path}
+</csv_path>
+
+Your analysis should focus on the following topic:
+
+<analysis_topic>
+{topic}
+</analysis_topic>
+
+You have access to the following tools for your analysis:
+1. load_csv: Use this to load the CSV file.
+2. run-script: Use this to execute Python scripts on the MCP server.
+
+Please follow these steps carefully:
+
+1. Load the CSV file using the load_csv tool.
+
+2. Explore the dataset. Provide a brief summary of its structure, including the number of rows, columns, and data types. Wrap your exploration process in <dataset_exploration> tags, including:
+   - List of key statistics about the dataset
+   - Potential challenges you foresee in analyzing this data
+
+3. Wrap your thought process in <analysis_planning> tags:
+   Analyze the dataset size and complexity:
+   - How many rows and columns does it have?
+   - Are there any potential computational challenges based on the data types or volume?
+   - What kind of questions would be appropriate given the dataset's characteristics and the analysis topic?
+   - How can we ensure that our questions won't result in excessively large outputs?
+
+   Based on this analysis:
+   - List 10 potential questions related to the analysis topic
+   - Evaluate each question against the following criteria:
+     * Directly related to the analysis topic
+     * Can be answered with reasonable computational effort
+     * Will produce manageable result sizes
+     * Provides meaningful insights into the data
+   - Select the top 5 questions that best meet all criteria
+
+4. List the 5 questions you've selected, ensuring they meet the criteria outlined above.
+
+5. For each question, follow these steps:
+   a. Wrap your thought process in <analysis_planning> tags:
+      - How can I structure the Python script to efficiently answer this question?
+      - What data preprocessing steps are necessary?
+      - How can I limit the output size to ensure stability?
+      - What type of visualization would best represent the results?
+      - Outline the main steps the script will follow
+   
+   b. Write a Python script to answer the question. Include comments explaining your approach and any measures taken to limit output size.
+   
+   c. Use the run_script tool to execute your Python script on the MCP server.
+   
+   d. Render the results returned by the run-script tool as a chart using plotly.js (prefer loading from cdnjs.cloudflare.com). Do not use react or recharts, and do not read the original CSV file directly. Provide the plotly.js code to generate the chart.
+
+6. After completing the analysis for all 5 questions, provide a brief summary of your findings and any overarching insights gained from the data.
+
+Remember to prioritize stability and manageability in your analysis. If at any point you encounter potential issues with large result sets, adjust your approach accordingly.
+
+Please begin your analysis by loading the CSV file and providing an initial exploration of the dataset.
+"""
+
+
+### Data Exploration Tools Description & Schema
+class DataExplorationTools(str, Enum):
+    LOAD_CSV = "load_csv"
+    LOAD_PARQUET = "load_parquet"
+    LOAD_FEATHER = "load_feather"
+    LOAD_JSON = "load_json"
+    LOAD_EXCEL = "load_excel"
+    REFRESH_CSV = "refresh_csv"
+    RUN_SCRIPT = "run_script"
+    DIFF_DATAFRAME = "diff_dataframe"
+    ROLLBACK_DATAFRAME = "rollback_dataframe"
+
+
+LOAD_CSV_TOOL_DESCRIPTION = """
+Load CSV File Tool
+
+Purpose:
+Load a local CSV file into a DataFrame.
+
+Usage Notes:
+	•	If a df_name is not provided, the tool will automatically assign names sequentially as df_1, df_2, and so on.
+	•	csv_path may also be a glob pattern (e.g. "exports/2024-06-*.csv") or a directory: all matching files are parsed in parallel and combined into one DataFrame.
+	•	Compressed files (.csv.gz, .csv.bz2, .csv.xz, .csv.zst) are decompressed while reading. A .zip archive loads all CSV files inside it; a single member can be loaded as "archive.zip/member.csv". Set source_column to add a column holding each row's source file.
+	•	Text columns holding dates or timestamps are detected and stored as datetime64 columns, with each column's format inferred once and parsed in a single vectorized pass, so scripts don't need pd.to_datetime. Set detect_dates to false to keep them as text.
+	•	Set optimize to true to store low-cardinality text columns as categoricals and numbers in the smallest safe type. The result reports the memory saved.
+	•	Set engine to "pyarrow" to parse with the multithreaded Arrow CSV reader and keep Arrow-backed columns (much smaller for text-heavy data). It cannot be combined with chunksize.
+	•	Set columns to load only the listed columns, and row_filter to a pandas query expression (e.g. "Department == 'CS' and Age > 20", with `backticks` around column names containing spaces) to keep only matching rows. Columns that are not needed are never parsed. With the default engine, rows are filtered chunk by chunk while reading, so filtered-out rows never accumulate; with engine "pyarrow", the whole file is parsed first and then filtered.
+	•	Set lazy to true to only read the header and a sample now: the result lists the columns, their types and an estimated row count, and the file is parsed when a script first refers to the DataFrame.
+	•	Parsed files are cached on disk, so loading an unchanged file again with the same options is near-instant. Set use_cache to false to force a fresh parse.
+	•	For very large files, set chunksize (rows per chunk) to stream the file in chunks. Column types are fixed to compact dtypes from the first chunk, which keeps peak memory close to the size of the loaded table.
+	•	Set sample to a number of rows for a quick first look at a large file: sample_method "head" (default) reads only the first rows, "reservoir" streams the whole file once and keeps a uniform random sample, and "stratified" keeps each value of the stratify_by column in proportion (at least one row each). Samples are reproducible, and can be refreshed with a full load under another df_name when needed.
+	•	Set background to true to get a sample right away (sample rows, 10,000 by default) while the full file is parsed in the background. Scripts that use the DataFrame wait for the full load, unless run with use_samples. If the full load fails, scripts that use the DataFrame report its error until it is loaded again; other scripts are unaffected.
+	•	Set report to true to get an ingestion report with the result: parse time, rows/s, MB/s, peak memory growth, each column's dtype and memory usage, and suggested load options. Use it to tune the options for a dataset.
+"""
+
+class CsvEngine(str, Enum):
+    C = "c"
+    PYARROW = "pyarrow"
+
+
+class SampleMethod(str, Enum):
+    HEAD = "head"
+    RESERVOIR = "reservoir"
+    STRATIFIED = "stratified"
+
+
+class LoadCsv(BaseModel):
+    csv_path: str
+    df_name: Optional[str] = None
+    chunksize: Optional[int] = None
+    optimize: bool = False
+    engine: CsvEngine = CsvEngine.C
+    use_cache: bool = True
+    columns: Optional[List[str]] = None
+    row_filter: Optional[str] = None
+    lazy: bool = False
+    source_column: Optional[str] = None
+    sample: Optional[int] = None
+    sample_method: SampleMethod = SampleMethod.HEAD
+    stratify_by: Optional[str] = None
+    background: bool = False
+    detect_dates: bool = True
+    report: bool = False
+
+
+
+LOAD_PARQUET_TOOL_DESCRIPTION = """
+Load Parquet File Tool
+
+Purpose:
+Load a local Parquet file (or a directory of Parquet files) into a DataFrame. Column types are read from the file, so there is no parsing cost and no type loss.
+
+Usage Notes:
+	•	If a df_name is not provided, the tool will automatically assign names sequentially as df_1, df_2, and so on.
+	•	Set columns to load only the listed columns, and row_filter to a pandas query expression (e.g. "Department == 'CS'") to keep only matching rows. Simple comparisons joined by "and" skip non-matching row groups entirely.
+"""
+
+class LoadParquet(BaseModel):
+    parquet_path: str
+    df_name: Optional[str] = None
+    columns: Optional[List[str]] = None
+    row_filter: Optional[str] = None
+
+
+LOAD_FEATHER_TOOL_DESCRIPTION = """
+Load Feather / Arrow IPC File Tool
+
+Purpose:
+Load a local Feather or Arrow IPC file into a DataFrame. The file is memory-mapped, so loading runs at disk speed.
+
+Usage Notes:
+	•	If a df_name is not provided, the tool will automatically assign names sequentially as df_1, df_2, and so on.
+"""
+
+class LoadFeather(BaseModel):
+    feather_path: str
+    df_name: Optional[str] = None
+
+
+LOAD_JSON_TOOL_DESCRIPTION = """
+Load JSON Lines File Tool
+
+Purpose:
+Load a local newline-delimited JSON file (one record per line) into a DataFrame.
+
+Usage Notes:
+	•	If a df_name is not provided, the tool will automatically assign names sequentially as df_1, df_2, and so on.
+"""
+
+class LoadJson(BaseModel):
+    json_path: str
+    df_name: Optional[str] = None
+
+
+LOAD_EXCEL_TOOL_DESCRIPTION = """
+Load Excel Workbook Tool
+
+Purpose:
+Load sheets of a local Excel workbook (.xlsx) into DataFrames, one DataFrame per sheet.
+
+Usage Notes:
+	•	Set sheets to the names of the sheets to load; all sheets are loaded if not provided.
+	•	If a df_name is provided, a single sheet is stored under it and several sheets as df_name_<sheet name>. Otherwise the tool assigns names sequentially as df_1, df_2, and so on, and the result lists which sheet went where.
+	•	Set header to the row number (0-based) holding the column names, e.g. when a sheet starts with a title row.
+	•	Parsing Excel is slow, so each sheet is converted once and cached on disk; later loads read the cache until the workbook changes. Set use_cache to false to force a fresh parse.
+	•	Columns mixing types (e.g. numbers and text codes) are stored as text, with empty cells kept as missing values.
+"""
+
+class LoadExcel(BaseModel):
+    excel_path: str
+    sheets: Optional[List[str]] = None
+    df_name: Optional[str] = None
+    header: int = 0
+    use_cache: bool = True
+
+
+REFRESH_CSV_TOOL_DESCRIPTION = """
+Refresh CSV Tool
+
+Purpose:
+Append rows added to a CSV file since it was loaded with load_csv to its DataFrame, parsing only the new part of the file. Use it for append-only files such as logs.
+
+Usage Notes:
+	•	Only DataFrames loaded from a single uncompressed CSV file can be refreshed, with the same columns and row_filter as the original load.
+	•	A last line without a trailing newline is loaded like any other row; the next refresh reads that line again and replaces its row.
+"""
+
+class RefreshCsv(BaseModel):
+    df_name: str
+
+
+RUN_SCRIPT_TOOL_DESCRIPTION = """
+Python Script Execution Tool
+
+Purpose:
+Execute Python scripts for specific data analytics tasks.
+
+Allowed Actions
+	1.	Print Results: Output will be displayed as the script’s stdout.
+	2.	[Optional] Save DataFrames: Store DataFrames in memory for future use by specifying a save_to_memory name.
+
+Prohibited Actions
+	1.	Creating Charts: Chart generation is not permitted.
+
+Usage Notes:
+	•	Scripts are stopped after timeout seconds (server default if not provided) and when they exceed the server's memory limit. A stopped script leaves all DataFrames unchanged.
+	•	Scripts work on snapshots of the DataFrames: changes made in place (including inplace=True) stay local to the script unless the DataFrame is listed in save_to_memory.
+	•	Set memoize to true for deterministic scripts: if the same script already ran against unchanged versions of every DataFrame it uses, its stored output and saved DataFrames are returned without running it again.
+	•	DataFrames still loading in the background are waited for. Set use_samples to true to run on their samples instead; the result then names the DataFrames that were sampled.
+"""
+
+class RunScript(BaseModel):
+    script: str
+    save_to_memory: Optional[List[str]] = None
+    timeout: Optional[float] = None
+    use_samples: bool = False
+    memoize: bool = False
+
+
+DIFF_DATAFRAME_TOOL_DESCRIPTION = """
+Diff DataFrame Tool
+
+Purpose:
+List the kept versions of a DataFrame and show what changed between two of them: shape, and columns added, removed or changed.
+
+Usage Notes:
+	•	A DataFrame gets a new version whenever it is loaded, refreshed or saved by a script; the versions it replaced are kept (the last 10 by default) until the server restarts.
+	•	By default the current version is compared with the version it replaced. Set version to compare another kept version, and against to compare it with something other than the current version.
+"""
+
+class DiffDataframe(BaseModel):
+    df_name: str
+    version: Optional[int] = None
+    against: Optional[int] = None
+
+
+ROLLBACK_DATAFRAME_TOOL_DESCRIPTION = """
+Rollback DataFrame Tool
+
+Purpose:
+Make an earlier version of a DataFrame current again, e.g. to undo a script that saved a wrong result, without reloading the file.
+
+Usage Notes:
+	•	By default the DataFrame goes back to the version it replaced most recently. Set version to any version listed by diff_dataframe.
+	•	The version rolled back from is kept, so a rollback can itself be rolled back.
+"""
+
+class RollbackDataframe(BaseModel):
+    df_name: str
+    version: Optional[int] = None
+
+
+### Script execution helpers
+class ScriptExecutionError(Exception):
+    """raised by _exec_script; kept to a single string argument so it pickles across process boundaries"""
+
+
+class ScriptAborted(BaseException):
+    """injected into a running script on timeout or cancellation
+
+    A BaseException so that a bare `except Exception` in the script cannot swallow it.
+    """
+
+
+class _ScriptJob:
+    """tracks where a script is running so that it can be interrupted"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self):
+        self.id = next(self._ids)
+        self.lock = threading.Lock()
+        self.thread_id: Optional[int] = None
+        self.aborted = False
+        self.signalled = False
+
+
+class _ThreadLocalStdout:
+    """sys.stdout proxy that routes writes to a per-thread buffer while a capture is active"""
+
+    def __init__(self, default):
+        self._default = default
+        self._local = threading.local()
+
+    def _target(self):
+        return getattr(self._local, "buffer", None) or self._default
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._default, name)
+
+
+_stdout_lock = threading.Lock()
+
+
+@contextmanager
+def _capture_stdout():
+    """capture everything the current thread prints, without touching other threads' output"""
+    with _stdout_lock:
+        if not isinstance(sys.stdout, _ThreadLocalStdout):
+            sys.stdout = _ThreadLocalStdout(sys.stdout)
+        proxy = sys.stdout
+    buffer = StringIO()
+    proxy._local.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        proxy._local.buffer = None
+
+
+# compiled scripts kept per process; the model often re-runs the same script
+SCRIPT_CACHE_SIZE = 256
+# builtins that can reach variables by name, which static analysis cannot follow
+_DYNAMIC_NAME_BUILTINS = {"locals", "globals", "vars", "dir", "eval", "exec"}
+
+
+class CompiledScript:
+    """a script's code object and what static analysis can tell about it
+
+    names is the set of names the script refers to, or None if it may look names up
+    dynamically; inputs are the names it may read before assigning them itself (None
+    likewise), and imports holds the top-level modules it imports. A script that does not
+    compile keeps the error, which is raised when it is run.
+    """
+
+    def __init__(self, script: str):
+        self.code = None
+        self.error: Optional[Exception] = None
+        names, inputs, imports = set(), set(), set()
+        try:
+            tree = ast.parse(script, "<string>")
+            self.code = compile(tree, "<string>", "exec")
+        except (SyntaxError, ValueError) as e:
+            self.error = e
+        else:
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Name):
+                    names.add(node.id)
+                elif isinstance(node, ast.Import):
+                    imports.update(alias.name.split(".")[0] for alias in node.names)
+                elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                    imports.add(node.module.split(".")[0])
+            inputs = _statement_inputs(tree.body)
+        dynamic = bool(names & _DYNAMIC_NAME_BUILTINS)
+        self.names = None if dynamic else frozenset(names)
+        self.inputs = None if dynamic else frozenset(inputs)
+        self.imports = frozenset(imports)
+
+
+def _statement_inputs(statements: list) -> set:
+    """names read by top-level statements that an earlier plain assignment has not already bound
+
+    Only unconditional top-level assignments count as binding, so anything else (loops,
+    branches, functions) is conservatively treated as possibly reading the outer value.
+    An augmented assignment such as `t += 1` reads its target, though the target is in
+    Store context.
+    """
+    inputs, bound = set(), set()
+    for statement in statements:
+        inputs |= {node.id for node in ast.walk(statement)
+                   if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load)} - bound
+        inputs |= {node.target.id for node in ast.walk(statement)
+                   if isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name)} - bound
+        if isinstance(statement, ast.Assign) or (isinstance(statement, ast.AnnAssign) and statement.value):
+            targets = statement.targets if isinstance(statement, ast.Assign) else [statement.target]
+            bound |= {node.id for target in targets for node in ast.walk(target)
+                      if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store)}
+    return inputs
+
+
+@functools.lru_cache(maxsize=SCRIPT_CACHE_SIZE)
+def _compile_script(script: str) -> CompiledScript:
+    """parse and compile a script once, however often it is run"""
+    return CompiledScript(script)
+
+
+def _exec_script(script: str, frames: dict, save_to_memory: Optional[List[str]] = None):
+    """run a script against the given dataframes and return (stdout, saved dataframes)
+
+    Only names the script binds can be saved, so save_to_memory cannot reach dataframes the
+    script was not given. Runs on a worker thread or in a worker process, so it must not
+    touch ScriptRunner state.
+    """
+    compiled = _compile_script(script)
+    if compiled.error is not None:
+        raise ScriptExecutionError(str(compiled.error)) from compiled.error
+    local_dict = dict(frames)
+    try:
+        with _capture_stdout() as stdout_capture:
+            # pylint: disable=exec-used
+            exec(compiled.code, \
+                {'pd': pd, 'np': np, 'scipy': scipy, 'sklearn': sklearn, 'statsmodels': sm}, \
+                local_dict)
+    except MemoryError as e:
+        raise ScriptExecutionError("script exceeded the memory limit") from e
+    except Exception as e:
+        raise ScriptExecutionError(str(e)) from e
+    saved = {df_name: local_dict[df_name] for df_name in save_to_memory or [] if df_name in local_dict}
+    return stdout_capture.getvalue(), saved
+
+
+def _exec_script_in_thread(job: _ScriptJob, script: str, frames: dict, save_to_memory: Optional[List[str]] = None):
+    """thread pool entry point: record the running thread so ScriptRunner can interrupt it"""
+    with job.lock:
+        if job.aborted:
+            raise ScriptAborted()
+        job.thread_id = threading.get_ident()
+    try:
+        return _exec_script(script, frames, save_to_memory)
+    finally:
+        with job.lock:
+            job.thread_id = None
+
+
+@contextmanager
+def _memory_limit(limit_mb: Optional[int]):
+    """cap the address space this process may grow by while the block runs (Linux only)"""
+    if not limit_mb or resource is None or not os.path.exists("/proc/self/statm"):
+        yield
+        return
+    with open("/proc/self/statm") as statm:
+        in_use = int(statm.read().split()[0]) * resource.getpagesize()
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    cap = in_use + limit_mb * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        cap = min(cap, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (cap, hard))
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+class _SharedFrame:
+    """a DataFrame published to a shared memory segment so worker processes can attach to it
+
+    Frames are written once as an Arrow IPC stream (falling back to pickle for columns Arrow
+    cannot represent) and read by every worker, instead of being pickled for each call.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.users = 0
+        self.closed = False
+        try:
+            table = pa.Table.from_pandas(df)
+            self.format = "arrow"
+        except (pa.ArrowException, TypeError, ValueError):
+            table = None
+            self.format = "pickle"
+        if table is not None:
+            mock = pa.MockOutputStream()
+            with pa.ipc.new_stream(mock, table.schema) as writer:
+                writer.write_table(table)
+            self.size = mock.size()
+            self.shm = shared_memory.SharedMemory(create=True, size=max(self.size, 1))
+            target = pa.py_buffer(self.shm.buf)
+            with pa.ipc.new_stream(pa.FixedSizeBufferWriter(target), table.schema) as writer:
+                writer.write_table(table)
+            del target
+        else:
+            payload = pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+            self.size = len(payload)
+            self.shm = shared_memory.SharedMemory(create=True, size=max(self.size, 1))
+            self.shm.buf[:self.size] = payload
+
+    @property
+    def descriptor(self) -> tuple:
+        return self.shm.name, self.size, self.format
+
+    def close(self):
+        self.closed = True
+        self.shm.close()
+        self.shm.unlink()
+
+
+# worker process side: shared memory segment name -> (SharedMemory, DataFrame)
+_attached_frames: dict = {}
+
+
+def _attach_frame(segment: str, size: int, fmt: str) -> pd.DataFrame:
+    """map a published frame into this worker, reusing it across calls while it stays published"""
+    if segment not in _attached_frames:
+        shm = shared_memory.SharedMemory(name=segment)
+        if fmt == "arrow":
+            # numeric columns without nulls stay zero-copy views of the shared segment
+            buffer = pa.py_buffer(shm.buf)[:size]
+            df = pa.ipc.open_stream(buffer).read_all().to_pandas(split_blocks=True)
+        else:
+            df = pickle.loads(shm.buf[:size])
+        _attached_frames[segment] = (shm, df)
+    return _attached_frames[segment][1]
+
+
+def _release_frames(keep: set):
+    for segment in list(_attached_frames):
+        if segment not in keep:
+            shm, df = _attached_frames.pop(segment)
+            # drop our own reference first, or the frame always pins the segment's buffer
+            del df
+            try:
+                shm.close()
+            except BufferError:
+                # a dataframe built from the segment is still referenced; the mapping goes with it
+                pass
+
+
+# worker process side: job bookkeeping shared with the ScriptRunner
+_started_jobs = None
+_aborted_jobs = None
+_current_job: Optional[int] = None
+
+
+def _init_worker(started_jobs, aborted_jobs):
+    global _started_jobs, _aborted_jobs
+    _started_jobs = started_jobs
+    _aborted_jobs = aborted_jobs
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, _on_abort_signal)
+
+
+def _on_abort_signal(signum, frame):
+    # the signal may race with the worker moving on to another job, so only abort the marked one
+    if _current_job is not None and _current_job in _aborted_jobs:
+        raise ScriptAborted()
+
+
+def _exec_script_shared(job_id: int, script: str, descriptors: dict, published: set,
+                        save_to_memory: Optional[List[str]] = None, memory_limit_mb: Optional[int] = None):
+    """worker process entry point: attach to the shared dataframes the script uses and run it
+
+    Frames attached by earlier calls stay mapped while their segment is still `published`.
+    """
+    global _current_job
+    _started_jobs.put((job_id, os.getpid()))
+    _current_job = job_id
+    try:
+        if job_id in _aborted_jobs:
+            raise ScriptAborted()
+        _release_frames(published)
+        # shallow copies so changes in one script don't leak into the cached frame; writes to the
+        # read-only shared buffers copy the affected columns (copy-on-write)
+        frames = {
+            df_name: _attach_frame(*descriptor).copy(deep=False)
+            for df_name, descriptor in descriptors.items()
+        }
+        with _memory_limit(memory_limit_mb):
+            return _exec_script(script, frames, save_to_memory)
+    finally:
+        _current_job = None
+
+
+def _warm_worker():
+    return os.getpid()
+
+
+### Lazy datasets
+# rows read to describe a lazily loaded CSV
+SNIFF_ROWS = 1000
+
+
+def _script_names(script: str) -> Optional[frozenset]:
+    """names a script refers to, or None if it may look names up dynamically"""
+    # a script that does not compile needs nothing loaded; running it reports the error
+    return _compile_script(script).names
+
+
+def _sample_source_bytes(csv_path: str) -> int:
+    """bytes of the source file taken up by the header and the first SNIFF_ROWS rows
+
+    For compressed files this is the compressed size, measured from how far the
+    decompressor has read into the file.
+    """
+    member = _zip_member(csv_path)
+    if member is not None:
+        # zip member sizes are uncompressed, so count uncompressed bytes too
+        with zipfile.ZipFile(member[0]) as archive, archive.open(member[1]) as f:
+            return sum(len(line) for line in itertools.islice(f, SNIFF_ROWS + 1))
+    codec = _compression(csv_path)
+    with open(csv_path, "rb") as raw:
+        stream = _DECOMPRESSORS[codec](raw) if codec else raw
+        lines = list(itertools.islice(stream, SNIFF_ROWS + 1))
+        if not codec:
+            return sum(len(line) for line in lines)
+        consumed = raw.tell()
+        if consumed < os.fstat(raw.fileno()).st_size:
+            return consumed
+        # the decompressor read the whole file in one block: share it out over all the lines
+        total_lines = len(lines) + sum(1 for _ in stream)
+        return consumed * len(lines) // total_lines
+
+
+def _sniff_csv(csv_paths: list[str], detect_dates: bool = False, **read_options):
+    """column dtypes from the first rows of the first CSV, and a row count estimated from their size"""
+    sample = _read_csv_source(csv_paths[0], nrows=SNIFF_ROWS, **read_options)
+    if detect_dates:
+        sample, _ = _parse_datetime_columns(sample)
+    if len(csv_paths) == 1 and len(sample) < SNIFF_ROWS:
+        return sample.dtypes, len(sample)
+    sample_bytes = _sample_source_bytes(csv_paths[0])
+    if not sample_bytes:
+        return sample.dtypes, len(sample)
+    total_bytes = sum(_source_size(path) for path in csv_paths)
+    return sample.dtypes, int(total_bytes * len(sample) / sample_bytes)
+
+
+class LazyDataset:
+    """placeholder in ScriptRunner.data for a dataset that is parsed when a script first uses it"""
+
+    def __init__(self, loader, dtypes: pd.Series, row_estimate: int):
+        self._loader = loader
+        self.dtypes = dtypes
+        self.row_estimate = row_estimate
+        self._lock = threading.Lock()
+        self._df: Optional[pd.DataFrame] = None
+
+    def load(self) -> pd.DataFrame:
+        # the lock makes concurrent scripts wait for a single parse instead of starting their own
+        with self._lock:
+            if self._df is None:
+                self._df = self._loader()
+            return self._df
+
+    def describe(self) -> str:
+        columns = "\n".join(f"  {name}: {dtype}" for name, dtype in self.dtypes.items())
+        return f"~{self.row_estimate:,} rows, {len(self.dtypes)} columns\nColumns:\n{columns}"
+
+
+class BackgroundDataset(LazyDataset):
+    """placeholder in ScriptRunner.data for a dataset parsed in a background thread, with a sample to use meanwhile"""
+
+    def __init__(self, loader, sample: pd.DataFrame):
+        super().__init__(loader, sample.dtypes, len(sample))
+        self.sample = sample
+        self._error: Optional[BaseException] = None
+        self._done = threading.Event()
+        threading.Thread(target=self._run, name="csv-background-load", daemon=True).start()
+
+    def _run(self):
+        try:
+            self._df = self._loader()
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._done.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def failed(self) -> bool:
+        return self._done.is_set() and self._error is not None
+
+    def load(self) -> pd.DataFrame:
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._df
+
+
+### CSV loading helpers
+# string columns with at most this share of distinct values are dictionary encoded
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+# rows per chunk when a row filter is applied while reading a CSV
+FILTER_CHUNKSIZE = 1_000_000
+
+_FILTER_OPS = {
+    ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">=",
+    ast.In: "in", ast.NotIn: "not in",
+}
+_FLIPPED_FILTER_OPS = {"<": ">", "<=": ">=", ">": "<", ">=": "<=", "==": "==", "!=": "!="}
+
+
+def _parse_row_filter(row_filter: str):
+    """parse a query expression, returning (expression tree, backtick placeholder -> column name)"""
+    quoted = {}
+
+    def placeholder(match):
+        name = f"__column_{len(quoted)}"
+        quoted[name] = match.group(1)
+        return name
+
+    return ast.parse(re.sub(r"`([^`]*)`", placeholder, row_filter).strip(), mode="eval").body, quoted
+
+
+def _row_filter_columns(row_filter: str) -> Optional[set]:
+    """columns a query expression refers to, or None if it cannot be parsed"""
+    try:
+        tree, quoted = _parse_row_filter(row_filter)
+    except SyntaxError:
+        return None
+    return {quoted.get(node.id, node.id) for node in ast.walk(tree) if isinstance(node, ast.Name)}
+
+
+def _row_filter_to_filters(row_filter: str) -> Optional[list]:
+    """translate "a == 1 and b in ['x']" style expressions into pyarrow filters
+
+    Returns None for anything beyond comparisons between a column and a literal joined by
+    "and"; such filters are applied with DataFrame.query after reading instead.
+    """
+    try:
+        tree, quoted = _parse_row_filter(row_filter)
+    except SyntaxError:
+        return None
+    clauses = tree.values if isinstance(tree, ast.BoolOp) and isinstance(tree.op, ast.And) else [tree]
+    filters = []
+    for clause in clauses:
+        if not isinstance(clause, ast.Compare) or len(clause.ops) != 1 or type(clause.ops[0]) not in _FILTER_OPS:
+            return None
+        op = _FILTER_OPS[type(clause.ops[0])]
+        left, right = clause.left, clause.comparators[0]
+        if not isinstance(left, ast.Name) and isinstance(right, ast.Name) and op in _FLIPPED_FILTER_OPS:
+            left, right, op = right, left, _FLIPPED_FILTER_OPS[op]
+        if not isinstance(left, ast.Name):
+            return None
+        try:
+            value = ast.literal_eval(right)
+        except ValueError:
+            return None
+        if op in ("in", "not in"):
+            if not isinstance(value, (list, tuple, set)):
+                return None
+            value = list(value)
+        filters.append((quoted.get(left.id, left.id), op, value))
+    return filters
+
+
+def _projection(columns: Optional[List[str]], row_filter: Optional[str]) -> Optional[list]:
+    """columns to read: the requested ones plus any the row filter needs"""
+    if not columns:
+        return None
+    needed = _row_filter_columns(row_filter) if row_filter else set()
+    if needed is None:
+        return None
+    return list(dict.fromkeys([*columns, *sorted(needed)]))
+
+
+def _select_columns(df: pd.DataFrame, columns: Optional[List[str]]) -> pd.DataFrame:
+    """drop columns that were only read to evaluate the row filter"""
+    if not columns:
+        return df
+    return df.drop(columns=[name for name in df.columns if name not in columns])
+
+
+# suffixes of files that are decompressed while reading, and their codecs
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd", ".zip": "zip"}
+CSV_SUFFIXES = (".csv", ".csv.gz", ".csv.bz2", ".csv.xz", ".csv.zst", ".zip")
+# codecs Arrow decodes natively, off the Python thread, when the pyarrow engine is used
+ARROW_CODECS = {"gzip", "bz2", "zstd"}
+
+
+def _zip_member(path: str) -> Optional[tuple]:
+    """(archive, member) for paths like "exports.zip/2024/06.csv", otherwise None"""
+    match = re.match(r"(.+?\.zip)[/\\](.+)$", path, re.IGNORECASE)
+    if match and os.path.isfile(match.group(1)):
+        return match.group(1), match.group(2).replace("\\", "/")
+    return None
+
+
+def _source_file(path: str) -> str:
+    """the file on disk that holds a CSV: the archive for zip members"""
+    member = _zip_member(path)
+    return member[0] if member else path
+
+
+def _source_size(path: str) -> int:
+    member = _zip_member(path)
+    if member is None:
+        return os.path.getsize(path)
+    with zipfile.ZipFile(member[0]) as archive:
+        return archive.getinfo(member[1]).file_size
+
+
+def _compression(path: str) -> Optional[str]:
+    if _zip_member(path):
+        return "zip"
+    return COMPRESSION_SUFFIXES.get(os.path.splitext(path)[1].lower())
+
+
+def _open_zstd(raw):
+    if zstandard is None:
+        raise ImportError("reading .zst files requires the zstandard package")
+    return BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw))
+
+
+_DECOMPRESSORS = {
+    "gzip": lambda raw: gzip.GzipFile(fileobj=raw),
+    "bz2": bz2.BZ2File,
+    "xz": lzma.LZMAFile,
+    "zstd": _open_zstd,
+}
+
+
+# seconds between progress notifications
+PROGRESS_INTERVAL = 1.0
+# progress(progress, total, message): the arguments of a progress notification
+ProgressCallback = Callable[[float, Optional[float], Optional[str]], None]
+
+
+class LoadProgress:
+    """bytes read and rows parsed across the files of one load, reported at most every PROGRESS_INTERVAL
+
+    `report(progress, total, message)` receives the bytes read so far, the size of the input
+    and a line with the rows parsed and the throughput; it may be called from several loader
+    threads.
+    """
+
+    def __init__(self, total_bytes: int, report: ProgressCallback):
+        self.total_bytes = total_bytes
+        self.report = report
+        self.bytes_read = 0
+        self.rows = 0
+        self.started = time.monotonic()
+        self._reported = self.started
+        self._lock = threading.Lock()
+
+    def read(self, size: int):
+        with self._lock:
+            self.bytes_read += size
+            self._maybe_report()
+
+    def parsed(self, rows: int):
+        with self._lock:
+            self.rows += rows
+            self._maybe_report()
+
+    def _maybe_report(self):
+        now = time.monotonic()
+        if now - self._reported < PROGRESS_INTERVAL:
+            return
+        self._reported = now
+        message = (f"Read {_format_bytes(self.bytes_read)} of {_format_bytes(self.total_bytes)}, "
+                   f"{self.rows:,} rows parsed ({self.throughput()})")
+        logger.info(message)
+        self.report(self.bytes_read, self.total_bytes, message)
+
+    def throughput(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        return f"{_format_bytes(self.bytes_read / elapsed)}/s"
+
+    def finish(self) -> str:
+        """send the final notification and describe the load for the result"""
+        summary = f"{self.rows:,} rows parsed in {time.monotonic() - self.started:.1f}s, {self.throughput()}"
+        self.report(self.total_bytes, self.total_bytes, summary)
+        return summary
+
+
+class _CountingReader(RawIOBase):
+    """binary stream that passes the number of bytes read from it to a callback"""
+
+    def __init__(self, stream, on_read: Callable[[int], None]):
+        self.stream = stream
+        self.on_read = on_read
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = self.stream.readinto(buffer)
+        if size:
+            self.on_read(size)
+        return size
+
+
+class _LimitedReader(RawIOBase):
+    """binary stream that ends after the first `limit` bytes of another one"""
+
+    def __init__(self, stream, limit: int):
+        self.stream = stream
+        self.remaining = limit
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.remaining <= 0:
+            return 0
+        size = self.stream.readinto(memoryview(buffer)[:self.remaining])
+        self.remaining -= size or 0
+        return size
+
+
+@contextmanager
+def _open_csv_input(csv_path: str, engine: Optional[str] = None, progress: Optional[LoadProgress] = None,
+                    limit: Optional[int] = None):
+    """what to hand pd.read_csv for a path, and the compression pandas should apply to it
+
+    That is an open zip member, an Arrow stream, an open file (to count the bytes read for
+    `progress`, or to stop after the first `limit` bytes of an uncompressed file), or the
+    path itself.
+    """
+    member = _zip_member(csv_path)
+    codec = _compression(csv_path)
+    if limit is not None:
+        with open(csv_path, "rb", buffering=0) as raw:
+            f = _LimitedReader(raw, limit)
+            yield BufferedReader(_CountingReader(f, progress.read) if progress else f), None
+    elif member is not None:
+        with zipfile.ZipFile(member[0]) as archive, archive.open(member[1]) as f:
+            yield (BufferedReader(_CountingReader(f, progress.read)) if progress else f), None
+    elif progress is None and engine == CsvEngine.PYARROW and codec in ARROW_CODECS:
+        # Arrow decompresses on its I/O thread while the parser threads work on earlier blocks
+        with pa.input_stream(csv_path, compression=codec) as f:
+            yield f, None
+    elif progress is None:
+        # pandas streams gzip, bz2, xz, zstd and single-member zip files itself
+        yield csv_path, "infer"
+    else:
+        with open(csv_path, "rb", buffering=0) as raw:
+            f = BufferedReader(_CountingReader(raw, progress.read))
+            if engine == CsvEngine.PYARROW and codec in ARROW_CODECS:
+                with pa.CompressedInputStream(f, codec) as stream:
+                    yield stream, None
+            else:
+                yield f, codec
+
+
+def _read_csv_source(csv_path: str, progress: Optional[LoadProgress] = None, limit: Optional[int] = None,
+                     **read_options) -> pd.DataFrame:
+    with _open_csv_input(csv_path, read_options.get("engine"), progress, limit) as (source, compression):
+        return pd.read_csv(source, compression=compression, **read_options)
+
+
+def _iter_csv_chunks(csv_path: str, chunksize: int, progress: Optional[LoadProgress] = None,
+                     limit: Optional[int] = None, **read_options):
+    with _open_csv_input(csv_path, read_options.get("engine"), progress, limit) as (source, compression):
+        for chunk in pd.read_csv(source, chunksize=chunksize, compression=compression, **read_options):
+            if progress is not None:
+                progress.parsed(len(chunk))
+            yield chunk
+
+
+def _compact_dtype(col: pd.Series):
+    """smallest dtype that holds the column's values without loss, or None to keep it as is"""
+    arrow_backed = isinstance(col.dtype, pd.ArrowDtype)
+    if pd.api.types.is_bool_dtype(col):
+        return None
+    if pd.api.types.is_integer_dtype(col):
+        dtype = pd.to_numeric(col, downcast="integer").dtype
+        return dtype if dtype != col.dtype else None
+    if pd.api.types.is_float_dtype(col) and col.dtype not in (np.float32, pd.ArrowDtype(pa.float32())):
+        values = col.to_numpy(dtype=np.float64, na_value=np.nan)
+        if np.array_equal(values.astype(np.float32).astype(np.float64), values, equal_nan=True):
+            return pd.ArrowDtype(pa.float32()) if arrow_backed else np.dtype(np.float32)
+        return None
+    if (pd.api.types.is_object_dtype(col) or pd.api.types.is_string_dtype(col)) and \
+            pd.api.types.infer_dtype(col, skipna=True) == "string":
+        if col.nunique() <= CATEGORICAL_MAX_UNIQUE_RATIO * len(col):
+            return "category"
+    return None
+
+
+def _compact_arrow_type(col: pd.Series) -> pa.DataType:
+    """Arrow equivalent of _compact_dtype, used to fix column types while streaming"""
+    dtype = _compact_dtype(col)
+    if dtype == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    if isinstance(dtype, pd.ArrowDtype):
+        return dtype.pyarrow_dtype
+    if dtype is not None:
+        return pa.from_numpy_dtype(dtype)
+    return pa.Array.from_pandas(col).type
+
+
+def _optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """downcast numeric columns and turn low-cardinality text columns into categoricals"""
+    dtypes = {name: dtype for name, dtype in
+              ((name, _compact_dtype(df[name])) for name in df.columns) if dtype is not None}
+    return df.astype(dtypes) if dtypes else df
+
+
+def _optimize_with_report(df: pd.DataFrame):
+    """_optimize_dtypes plus a line describing the memory saved"""
+    before = df.memory_usage(deep=True).sum()
+    df = _optimize_dtypes(df)
+    after = df.memory_usage(deep=True).sum()
+    return df, (f"\nOptimized dtypes: memory usage {_format_bytes(before)} -> "
+                f"{_format_bytes(after)} ({1 - after / max(before, 1):.0%} smaller)")
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+
+# values of a text column checked before the whole column is parsed as dates
+DATE_SNIFF_ROWS = 1000
+
+
+def _datetime_format(values: pd.Series) -> Optional[str]:
+    """a date format guessed from the first value that parses all of the values, or None"""
+    first = values.iloc[0]
+    if not isinstance(first, str):
+        return None
+    candidates = []
+    with warnings.catch_warnings():
+        # pandas warns when a day-first format is guessed without dayfirst=True
+        warnings.simplefilter("ignore", UserWarning)
+        for dayfirst in (False, True):
+            fmt = guess_datetime_format(first.strip(), dayfirst=dayfirst)
+            # a bare year or time of day is more likely a code than a date
+            if fmt and fmt not in candidates and re.search("%[Yy]", fmt) and re.search("%[mbB]", fmt):
+                candidates.append(fmt)
+    for fmt in candidates:
+        if pd.to_datetime(values, format=fmt, errors="coerce").notna().all():
+            return fmt
+    return None
+
+
+def _parse_datetime_columns(df: pd.DataFrame, names: Optional[list] = None):
+    """convert text columns (or `names` only) holding dates to datetime64, returning the names converted
+
+    Each column's format is inferred from a sample once and the column is then parsed with it
+    in one vectorized pass. Columns where any value does not match are left as text, and
+    categorical columns only parse their categories.
+    """
+    converted = {}
+    for name in df.columns if names is None else names:
+        col = df[name]
+        categorical = isinstance(col.dtype, pd.CategoricalDtype)
+        values = col.cat.categories.to_series() if categorical else col
+        if not (pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)):
+            continue
+        sample = values.dropna().head(DATE_SNIFF_ROWS)
+        if sample.empty:
+            continue
+        fmt = _datetime_format(sample)
+        if fmt is None:
+            continue
+        parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+        if parsed.isna().sum() != values.isna().sum():
+            continue
+        if categorical:
+            parsed = pd.Series(pd.DatetimeIndex(parsed).take(col.cat.codes.to_numpy(), allow_fill=True,
+                                                             fill_value=pd.NaT), index=col.index)
+        converted[name] = parsed
+    if converted:
+        df = df.assign(**converted)
+    return df, list(converted)
+
+
+def _datetime_details(df: pd.DataFrame) -> str:
+    # kind "M" covers datetime64, tz-aware and Arrow timestamp columns
+    names = [str(name) for name in df.columns if df[name].dtype.kind == "M"]
+    return f"\nDate/time columns: {', '.join(names)}" if names else ""
+
+
+# inputs from this size on are worth parsing with the multithreaded Arrow reader
+REPORT_PYARROW_MIN_BYTES = 64 * 1024 * 1024
+# loads with more columns than this are worth narrowing with `columns`
+REPORT_MAX_COLUMNS = 20
+
+
+def _rss() -> Optional[int]:
+    """resident set size of this process in bytes (Linux only)"""
+    if resource is None:
+        return None
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class _PeakRss:
+    """samples the resident set size from a background thread to find how far a block grows it"""
+    INTERVAL = 0.01
+
+    def __enter__(self):
+        self.start = self.peak = _rss()
+        self._stop = threading.Event()
+        self._thread = None
+        if self.start is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.INTERVAL):
+            self.peak = max(self.peak, _rss() or 0)
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.peak = max(self.peak, _rss() or 0)
+
+    @property
+    def delta(self) -> Optional[int]:
+        return None if self.start is None else self.peak - self.start
+
+
+def _ingestion_report(df: pd.DataFrame, input_bytes: int, seconds: Optional[float], peak_rss: Optional[int],
+                      engine: str, chunksize: Optional[int], optimize: bool, columns: Optional[List[str]]) -> str:
+    """parse speed, memory use per column and load options worth trying for a loaded CSV"""
+    lines = ["", "Ingestion report:"]
+    if seconds is not None:
+        elapsed = max(seconds, 1e-6)
+        lines.append(f"  parse time: {seconds:.2f}s, {len(df) / elapsed:,.0f} rows/s, "
+                     f"{_format_bytes(input_bytes / elapsed)}/s ({_format_bytes(input_bytes)} input)")
+    if peak_rss is not None:
+        lines.append(f"  peak RSS delta: {_format_bytes(max(peak_rss, 0))}")
+    memory = df.memory_usage(deep=True, index=False)
+    total = memory.sum()
+    lines.append(f"  memory: {_format_bytes(total)} for {len(df):,} rows x {len(df.columns)} columns")
+    for name, dtype in df.dtypes.items():
+        lines.append(f"    {name}: {dtype}, {_format_bytes(memory[name])}")
+
+    suggestions = []
+    if not optimize:
+        compactable = [name for name in df.columns if _compact_dtype(df[name]) is not None]
+        if compactable:
+            suggestions.append(f"optimize=true stores {len(compactable)} columns in smaller dtypes "
+                               f"({', '.join(map(str, compactable[:5]))}{', ...' if len(compactable) > 5 else ''})")
+    if engine != CsvEngine.PYARROW:
+        text_bytes = sum(memory[name] for name in df.columns if pd.api.types.is_object_dtype(df[name]))
+        if text_bytes > total / 2:
+            suggestions.append(f"engine=\"pyarrow\" keeps text columns as Arrow strings "
+                               f"({_format_bytes(text_bytes)} is in object columns)")
+        elif input_bytes >= REPORT_PYARROW_MIN_BYTES and not chunksize:
+            suggestions.append("engine=\"pyarrow\" parses with multiple threads")
+    if not columns and len(df.columns) > REPORT_MAX_COLUMNS:
+        suggestions.append("columns=[...] loads only the columns you need")
+    if peak_rss is not None and not chunksize and engine != CsvEngine.PYARROW and peak_rss > 2 * total:
+        suggestions.append("chunksize keeps peak memory close to the size of the loaded table")
+    lines.append("  suggestions:" if suggestions else "  suggestions: none")
+    lines.extend(f"    - {suggestion}" for suggestion in suggestions)
+    return "\n".join(lines)
+
+
+def _widen_arrow_type(current: pa.DataType, seen: pa.DataType) -> pa.DataType:
+    """type for a column whose later chunk does not fit the type fixed from the first chunk"""
+    if pa.types.is_integer(current) and pa.types.is_integer(seen):
+        return pa.int64()
+    if (pa.types.is_integer(current) or pa.types.is_floating(current)) and \
+            (pa.types.is_integer(seen) or pa.types.is_floating(seen) or pa.types.is_null(seen)):
+        return pa.float64()
+    return pa.string()
+
+
+def _conform_column(column: pa.ChunkedArray, target: pa.DataType) -> pa.ChunkedArray:
+    if pa.types.is_dictionary(target):
+        if not pa.types.is_dictionary(column.type):
+            column = column.cast(pa.string()).dictionary_encode()
+        return column
+    converted = column.cast(target)
+    if pa.types.is_float32(target) and pa.types.is_float64(column.type) and \
+            not converted.cast(pa.float64()).equals(column):
+        # Arrow allows float64 -> float32 even when it loses precision
+        raise pa.ArrowInvalid("float32 would lose precision")
+    return converted
+
+
+def _read_csv_chunked(csv_path: str, chunksize: int, row_filter: Optional[str] = None,
+                      progress: Optional[LoadProgress] = None, limit: Optional[int] = None,
+                      **read_options) -> pd.DataFrame:
+    """read a CSV chunk by chunk into compact Arrow columns, then hand them to pandas
+
+    Dtypes are inferred on the first chunk and applied to every following one; a column is
+    only widened if a later chunk does not fit. The Arrow buffers are released while the
+    final DataFrame is built, so peak memory stays close to the size of the loaded table.
+    """
+    schema: dict[str, pa.DataType] = {}
+    tables: list[pa.Table] = []
+    for chunk in _iter_csv_chunks(csv_path, chunksize, progress, limit, **read_options):
+        if not schema:
+            schema = {name: _compact_arrow_type(chunk[name]) for name in chunk.columns}
+        if row_filter:
+            chunk = chunk.query(row_filter)
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        columns = []
+        for name in table.column_names:
+            try:
+                columns.append(_conform_column(table[name], schema[name]))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                schema[name] = _widen_arrow_type(schema[name], table[name].type)
+                tables = [t.set_column(t.column_names.index(name), name, _conform_column(t[name], schema[name]))
+                          for t in tables]
+                columns.append(_conform_column(table[name], schema[name]))
+        tables.append(pa.table(columns, names=table.column_names))
+    if not tables:
+        return _read_csv_source(csv_path, nrows=0, **read_options)
+    table = pa.concat_tables(tables)
+    del tables
+    return table.to_pandas(self_destruct=True, split_blocks=True)
+
+
+def _read_csv(csv_path: str, chunksize: Optional[int] = None, columns: Optional[List[str]] = None,
+              row_filter: Optional[str] = None, progress: Optional[LoadProgress] = None,
+              limit: Optional[int] = None, **read_options) -> pd.DataFrame:
+    """pd.read_csv with column projection and the row filter pushed into the read
+
+    With `limit`, only that many bytes of the (uncompressed) file are read.
+    """
+    if columns:
+        read_options["usecols"] = _projection(columns, row_filter)
+    if chunksize:
+        df = _read_csv_chunked(csv_path, chunksize, row_filter, progress, limit, **read_options)
+    elif row_filter and read_options.get("engine") != CsvEngine.PYARROW:
+        # filter chunk by chunk so rows that are filtered out never accumulate
+        chunks = [chunk.query(row_filter) for chunk in
+                  _iter_csv_chunks(csv_path, FILTER_CHUNKSIZE, progress, limit, **read_options)]
+        df = pd.concat(chunks, ignore_index=True) if chunks else _read_csv_source(csv_path, nrows=0, **read_options)
+    else:
+        df = _read_csv_source(csv_path, progress, limit, **read_options)
+        if progress is not None:
+            progress.parsed(len(df))
+        if row_filter:
+            df = df.query(row_filter).reset_index(drop=True)
+    return _select_columns(df, columns)
+
+
+def _resolve_csv_paths(csv_path: str) -> list[str]:
+    """files a csv_path refers to: a single file, every CSV in a directory, or a glob pattern
+
+    Zip archives expand to their CSV members, addressed as "archive.zip/member.csv".
+    """
+    if os.path.isdir(csv_path):
+        paths = sorted(path for path in glob.glob(os.path.join(glob.escape(csv_path), "*"))
+                       if path.lower().endswith(CSV_SUFFIXES))
+    elif glob.has_magic(csv_path):
+        paths = sorted(path for path in glob.glob(csv_path, recursive=True) if os.path.isfile(path))
+    else:
+        paths = [csv_path]
+    if not paths:
+        raise FileNotFoundError(f"No CSV files found for '{csv_path}'")
+    expanded = []
+    for path in paths:
+        if path.lower().endswith(".zip") and os.path.isfile(path):
+            with zipfile.ZipFile(path) as archive:
+                members = sorted(name for name in archive.namelist()
+                                 if name.lower().endswith(".csv") and not name.startswith("__MACOSX/"))
+            if not members:
+                raise FileNotFoundError(f"No CSV files found in '{path}'")
+            expanded.extend(f"{path}/{member}" for member in members)
+        else:
+            expanded.append(path)
+    return expanded
+
+
+def _concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """pd.concat that keeps categorical columns categorical when their categories differ"""
+    if len(frames) == 1:
+        return frames[0]
+    for name in frames[0].columns:
+        if all(name in df.columns and isinstance(df[name].dtype, pd.CategoricalDtype) for df in frames):
+            categories = pd.api.types.union_categoricals([df[name] for df in frames]).categories
+            frames = [df.assign(**{name: df[name].cat.set_categories(categories)}) for df in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+# rows per chunk while streaming files for a sample
+SAMPLE_CHUNKSIZE = 100_000
+# seed for reservoir and stratified samples, so loading a sample again gives the same rows
+SAMPLE_SEED = 0
+# rows served while a background load runs, unless a sample size is given
+BACKGROUND_SAMPLE_ROWS = 10_000
+
+
+def _sample_chunks(csv_paths: list[str], chunksize: int, columns: Optional[List[str]], row_filter: Optional[str],
+                   source_column: Optional[str], progress: Optional[LoadProgress], read_options: dict,
+                   limit: Optional[int] = None):
+    """filtered chunks of every file in turn (up to `limit` bytes of a single uncompressed file)"""
+    # the pyarrow engine can't stream a file in chunks
+    read_options = dict(read_options, engine=CsvEngine.C.value)
+    if columns:
+        read_options["usecols"] = columns
+    for path in csv_paths:
+        for chunk in _iter_csv_chunks(path, chunksize, progress, limit, **read_options):
+            if row_filter:
+                chunk = chunk.query(row_filter)
+            if source_column:
+                chunk = chunk.assign(**{source_column: path})
+            yield chunk
+
+
+def _stratified_quotas(counts: pd.Series, size: int) -> pd.Series:
+    """rows to keep per stratum: proportional to its share of all rows, by largest remainder, at least one
+
+    Rows given to small strata to reach one each come out of the most over-represented
+    larger strata, so the quotas only add up to more than size when there are more strata.
+    """
+    exact = counts * size / counts.sum()
+    quotas = np.minimum(np.maximum(np.floor(exact), 1), counts)
+    while quotas.sum() > size and (quotas > 1).any():
+        excess = (quotas - exact)[quotas > 1]
+        quotas[excess.idxmax()] -= 1
+    remaining = int(size - quotas.sum())
+    if remaining > 0:
+        for label in (exact - np.floor(exact)).sort_values(ascending=False, kind="stable").index:
+            if remaining == 0:
+                break
+            if quotas[label] < counts[label]:
+                quotas[label] += 1
+                remaining -= 1
+    return quotas.astype(int)
+
+
+def _head_sample(chunks, size: int) -> Optional[pd.DataFrame]:
+    frames, rows = [], 0
+    for chunk in chunks:
+        frames.append(chunk.head(size - rows))
+        rows += len(frames[-1])
+        if rows >= size:
+            # stop reading the file
+            chunks.close()
+            break
+    return pd.concat(frames, ignore_index=True) if frames else None
+
+
+def _random_sample(chunks, size: int, stratify_by: Optional[str] = None):
+    """a uniform (or per-stratum) sample of the streamed rows in file order, and the number of rows seen
+
+    Every row gets a random key and only the rows with the smallest keys (per stratum) are
+    kept, so memory stays bounded by the sample rather than the file.
+    """
+    rng = np.random.default_rng(SAMPLE_SEED)
+    kept: Optional[pd.DataFrame] = None
+    keys = np.empty(0)
+    counts = pd.Series(dtype=np.int64)
+    seen = 0
+    for chunk in chunks:
+        seen += len(chunk)
+        kept = chunk if kept is None else pd.concat([kept, chunk], ignore_index=True)
+        keys = np.concatenate([keys, rng.random(len(chunk))])
+        if stratify_by is None:
+            if len(kept) > size:
+                positions = np.sort(np.argpartition(keys, size)[:size])
+                kept, keys = kept.iloc[positions].reset_index(drop=True), keys[positions]
+        else:
+            counts = counts.add(chunk[stratify_by].value_counts(dropna=False), fill_value=0).astype(np.int64)
+            ranks = pd.Series(keys).groupby(kept[stratify_by].to_numpy(), dropna=False).rank(method="first")
+            positions = np.flatnonzero(ranks.to_numpy() <= size)
+            kept, keys = kept.iloc[positions].reset_index(drop=True), keys[positions]
+    if kept is not None and stratify_by is not None and len(kept):
+        quotas = _stratified_quotas(counts, size)
+        ranks = pd.Series(keys).groupby(kept[stratify_by].to_numpy(), dropna=False).rank(method="first")
+        limits = kept[stratify_by].map(quotas).fillna(0)
+        kept = kept[ranks.to_numpy() <= limits.to_numpy()].reset_index(drop=True)
+    return kept, seen
+
+
+def _sample_csvs(csv_paths: list[str], size: int, method: str, stratify_by: Optional[str],
+                 columns: Optional[List[str]], row_filter: Optional[str], source_column: Optional[str],
+                 progress: Optional[LoadProgress], read_options: dict, limit: Optional[int] = None):
+    """a sample of the rows of one or more CSVs, and the number of rows it was drawn from
+
+    The row count is None for head samples, which stop reading once they have enough rows.
+    """
+    method = SampleMethod(method)
+    if method == SampleMethod.STRATIFIED and not stratify_by:
+        raise ValueError("stratified sampling needs stratify_by")
+    projection = _projection(columns, row_filter)
+    if projection and method == SampleMethod.STRATIFIED:
+        projection = list(dict.fromkeys([*projection, stratify_by]))
+    if method == SampleMethod.HEAD:
+        chunksize = SAMPLE_CHUNKSIZE if row_filter else min(size, SAMPLE_CHUNKSIZE)
+        chunks = _sample_chunks(csv_paths, chunksize, projection, row_filter, source_column, progress, read_options,
+                                limit)
+        df, rows_seen = _head_sample(chunks, size), None
+    else:
+        chunks = _sample_chunks(csv_paths, SAMPLE_CHUNKSIZE, projection, row_filter, source_column, progress,
+                                read_options, limit)
+        df, rows_seen = _random_sample(chunks, size, stratify_by if method == SampleMethod.STRATIFIED else None)
+    if df is None:
+        read_options = dict(read_options, engine=CsvEngine.C.value, usecols=projection)
+        df = _read_csv_source(csv_paths[0], nrows=0, **read_options)
+    if source_column:
+        df[source_column] = pd.Categorical(df.get(source_column), categories=csv_paths)
+    return _select_columns(df, columns + [source_column] if columns and source_column else columns), rows_seen
+
+
+class _CsvTail:
+    """how far a loaded CSV has been read, so that refresh_csv only parses appended rows"""
+
+    def __init__(self, csv_path: str, columns: Optional[List[str]], row_filter: Optional[str], read_options: dict):
+        self.csv_path = csv_path
+        self.names = list(pd.read_csv(csv_path, nrows=0).columns)
+        self.columns = columns
+        self.row_filter = row_filter
+        self.read_options = read_options
+        # end of the last complete line read, and of everything read
+        self.offset = 0
+        self.size = 0
+        # rows parsed from a last line that had no newline yet; the next refresh replaces them
+        self.pending_rows = 0
+
+    def mark(self) -> int:
+        """note the current size of the file, and return it for the full parse to stop at
+
+        Taken just before the full parse, so rows appended while it runs are left for the next
+        refresh. Like pd.read_csv, the parse includes a last line without a newline (many
+        exporters end files that way, and a writer may be halfway through one); the offset stays
+        at the start of that line so that refresh_csv reads it again.
+        """
+        self.size = end = os.path.getsize(self.csv_path)
+        self.offset = 0
+        with open(self.csv_path, "rb") as f:
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    self.offset = start + newline + 1
+                    break
+                end = start
+            f.seek(self.offset)
+            last_line = f.read(self.size - self.offset)
+        # with no newline at all, the last line is the header
+        self.pending_rows = len(self._parse(last_line)) if self.offset and last_line.strip() else 0
+        return self.size
+
+    def _parse(self, lines: bytes) -> pd.DataFrame:
+        # appended parts are small, so they are read whole with the C engine: the pyarrow engine
+        # rejects a single line without a newline, and usecols rejects one cut short
+        read_options = dict(self.read_options, engine=CsvEngine.C.value)
+        df = pd.read_csv(BytesIO(lines), header=None, names=self.names, **read_options)
+        if self.row_filter:
+            df = df.query(self.row_filter)
+        return _select_columns(df, self.columns)
+
+    def read_appended(self) -> Optional[tuple[pd.DataFrame, int]]:
+        """parse what was written since the last read, or None if nothing was
+
+        Returns the parsed rows and how many rows at the end of the dataframe they replace:
+        those parsed earlier from a last line that had no newline yet.
+        """
+        size = os.path.getsize(self.csv_path)
+        if size < self.size:
+            raise ValueError(f"'{self.csv_path}' is smaller than when it was last read; load it again")
+        if size == self.size:
+            return None
+        with open(self.csv_path, "rb") as f:
+            f.seek(self.offset)
+            appended = f.read(size - self.offset)
+        if self.offset == 0:
+            # the file had no complete line when loaded, so the header is part of what was read
+            header_end = appended.find(b"\n") + 1
+            if not header_end:
+                self.size = size
+                return None
+            appended = appended[header_end:]
+            self.offset = header_end
+        end = appended.rfind(b"\n") + 1
+        complete, last_line = appended[:end], appended[end:]
+        frames = [self._parse(lines) for lines in (complete, last_line) if lines.strip()]
+        replaced = self.pending_rows
+        self.offset += end
+        self.size = size
+        self.pending_rows = len(frames[-1]) if last_line.strip() else 0
+        if not frames:
+            return None
+        return _concat_frames(frames), replaced
+
+
+def _conform_appended(dtypes: pd.Series, appended: pd.DataFrame) -> pd.DataFrame:
+    """cast appended columns to the dtypes of the columns they are appended to, where no value changes
+
+    Compact dtypes chosen by optimize can't hold every appended value (an int8 column wraps
+    40000 around to 64), so a cast that doesn't round-trip is skipped and pd.concat widens
+    the column to a dtype that holds both.
+    """
+    appended = appended.copy(deep=False)
+    for name, dtype in dtypes.items():
+        if name not in appended.columns or appended[name].dtype == dtype:
+            continue
+        column = appended[name]
+        if isinstance(dtype, pd.CategoricalDtype):
+            # _concat_frames merges the categories
+            appended[name] = column.astype("category")
+            continue
+        try:
+            cast = column.astype(dtype)
+            if cast.astype(column.dtype).equals(column):
+                appended[name] = cast
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return appended
+
+
+def _read_parquet(parquet_path: str, columns: Optional[List[str]] = None,
+                  row_filter: Optional[str] = None) -> pd.DataFrame:
+    """pd.read_parquet with the row filter pushed down as pyarrow filters when possible"""
+    filters = _row_filter_to_filters(row_filter) if row_filter else None
+    df = pd.read_parquet(parquet_path, columns=_projection(columns, row_filter), filters=filters or None)
+    if row_filter and filters is None:
+        df = df.query(row_filter).reset_index(drop=True)
+    return _select_columns(df, columns)
+
+
+### Parsed dataset cache
+def _source_key(paths: list[str], **options) -> str:
+    """identifies the result of loading these files with these options
+
+    Built from each file's path, size and mtime, so the key changes whenever a file does.
+    """
+    sources = []
+    for path in paths:
+        stat = os.stat(_source_file(path))
+        sources.append({"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+    source = {"sources": sources, "options": options}
+    return hashlib.sha256(json.dumps(source, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class DatasetCache:
+    """on-disk cache of parsed DataFrames, stored as Arrow IPC files
+
+    Entries are keyed on the source file's path, size and mtime plus the load options, so a
+    changed file or different options never hit a stale entry. Reads are memory-mapped, and the
+    least recently used entries are evicted once the cache grows past max_bytes. Failing cache
+    I/O is logged and treated as a miss, so it never fails a load.
+    """
+
+    SUFFIX = ".arrow"
+    # temporary files untouched for this long were left behind by an interrupted write
+    STALE_TEMP_SECONDS = 3600
+
+    def __init__(self, directory: str, max_bytes: int):
+        """raises OSError if the directory cannot be created"""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._remove_stale_temp_files()
+
+    def _remove_stale_temp_files(self):
+        cutoff = time.time() - self.STALE_TEMP_SECONDS
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.name.endswith(".tmp") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                continue
+
+    def key(self, path: str, **options) -> str:
+        return _source_key([path], **options)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        path = self._path(key)
+        try:
+            table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        except FileNotFoundError:
+            return None
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+        try:
+            # the mtime doubles as the last-used time for eviction
+            os.utime(path)
+        except OSError as e:
+            logger.warning(f"Cannot update cache entry {path}: {e}")
+        return table.to_pandas()
+
+    def put(self, key: str, df: pd.DataFrame) -> bool:
+        """cache df under key, returning whether it was stored"""
+        try:
+            table = pa.Table.from_pandas(df)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            logger.debug(f"Not caching dataframe: {e}")
+            return False
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            # recreated in case the directory was removed while the server runs
+            os.makedirs(self.directory, exist_ok=True)
+            with pa.OSFile(temp_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(temp_path, path)
+            self.evict()
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f"Not caching dataframe: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.SUFFIX):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # evicted concurrently by another load
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+def _mixed_columns_as_text(df: pd.DataFrame) -> tuple[pd.DataFrame, list]:
+    """convert object columns mixing types (e.g. numbers and codes in one Excel column) to text
+
+    Arrow, and so the cache, cannot hold such columns. Missing values stay missing. Returns
+    the dataframe and the names of the converted columns.
+    """
+    mixed = []
+    for position, dtype in enumerate(df.dtypes):
+        if dtype == object:
+            try:
+                pa.array(df.iloc[:, position], from_pandas=True)
+            except (pa.ArrowException, TypeError, ValueError):
+                mixed.append(position)
+    if not mixed:
+        return df, []
+    df = df.copy(deep=False)
+    for position in mixed:
+        column = df.iloc[:, position]
+        df.isetitem(position, column.astype(str).where(column.notna()))
+    return df, [str(df.columns[position]) for position in mixed]
+
+
+### Versioned dataframe store
+# earlier versions kept per dataframe name
+HISTORY_VERSIONS = 10
+# memory all earlier versions together may hold
+HISTORY_MAX_MB = 1024
+
+
+def _buffer_id(values) -> Optional[tuple]:
+    """identify the numpy buffer behind the values of a column or index (None for other arrays)"""
+    if isinstance(values, pd.RangeIndex):
+        return None
+    if isinstance(values, pd.Index):
+        values = values.values
+    if not isinstance(values, np.ndarray):
+        return None
+    interface = values.__array_interface__
+    return interface["data"][0], interface["shape"], interface["typestr"]
 
-class PromptArgs(str, Enum):
-    CSV_PATH = "csv_path"
-    TOPIC = "topic"
 
-PROMPT_TEMPLATE = """
-You are a professional Data Scientist tasked with performing exploratory data analysis on a dataset. Your goal is to provide insightful analysis while ensuring stability and manageable result sizes.
+def _unshared_bytes(old, new) -> int:
+    """approximate memory of old that new does not share
 
-First, load the CSV file from the following path:
+    With copy-on-write, a dataframe shares the buffers of every column it has not changed
+    since the one it replaced, so only the changed columns (or all of them, after a reload
+    or a concat) cost memory of their own.
+    """
+    old = old.to_frame() if isinstance(old, pd.Series) else old
+    new = new.to_frame() if isinstance(new, pd.Series) else new
+    buffers = set()
+    if isinstance(new, pd.DataFrame):
+        buffers = {_buffer_id(new.iloc[:, position].values) for position in range(new.shape[1])}
+        buffers.add(_buffer_id(new.index))
+    buffers.discard(None)
+    # deep, so strings in object columns are counted too
+    size = 0 if _buffer_id(old.index) in buffers else old.index.memory_usage(deep=True)
+    for position in range(old.shape[1]):
+        column = old.iloc[:, position]
+        if _buffer_id(column.values) not in buffers:
+            size += column.memory_usage(index=False, deep=True)
+    return int(size)
 
-<csv_path>
-{csv_path}
-</csv_path>
 
-Your analysis should focus on the following topic:
+class VersionedData(dict):
+    """ScriptRunner.data, with a version that changes whenever a name is assigned or removed
 
-<analysis_topic>
-{topic}
-</analysis_topic>
+    Versions come from one counter, so a version number always stands for the same value.
+    Dataframes that are replaced or removed are kept in history as earlier versions of their
+    name (the max_history most recently replaced ones), to diff against and roll back to.
+    An earlier version is charged for the memory it does not share with the value that
+    replaced it, and the oldest versions of any name are dropped while the charges exceed
+    max_history_bytes: a reload or a refreshed CSV shares nothing, so it is charged in full.
+    """
 
-You have access to the following tools for your analysis:
-1. load_csv: Use this to load the CSV file.
-2. run-script: Use this to execute Python scripts on the MCP server.
+    _counter = itertools.count(1)
 
-Please follow these steps carefully:
+    def __init__(self, *args, max_history: int = HISTORY_VERSIONS,
+                 max_history_bytes: int = HISTORY_MAX_MB * 1024 * 1024, **kwargs):
+        super().__init__()
+        self.versions: dict[str, int] = {}
+        self.max_history = max_history
+        self.max_history_bytes = max_history_bytes
+        # name -> {version: dataframe}, least recently replaced first
+        self.history: dict[str, dict[int, object]] = {}
+        # (name, version) -> memory charged for that earlier version, least recently replaced first
+        self._history_sizes: dict[tuple[str, int], int] = {}
+        self.history_bytes = 0
+        self.update(*args, **kwargs)
 
-1. Load the CSV file using the load_csv tool.
+    def _archive(self, key, replacement=None):
+        """keep the current value of key as an earlier version (lazy datasets are not kept)"""
+        value = super().get(key)
+        if not isinstance(value, (pd.DataFrame, pd.Series)) or self.max_history <= 0:
+            return
+        kept = self.history.setdefault(key, {})
+        version = self.versions[key]
+        kept[version] = value
+        self._history_sizes[(key, version)] = size = _unshared_bytes(value, replacement)
+        self.history_bytes += size
+        while len(kept) > self.max_history:
+            self._forget(key, next(iter(kept)))
+        while self.history_bytes > self.max_history_bytes:
+            self._forget(*next(iter(self._history_sizes)))
 
-2. Explore the dataset. Provide a brief summary of its structure, including the number of rows, columns, and data types. Wrap your exploration process in <dataset_exploration> tags, including:
-   - List of key statistics about the dataset
-   - Potential challenges you foresee in analyzing this data
+    def _forget(self, key, version: int):
+        """drop an earlier version of key from history"""
+        del self.history[key][version]
+        if not self.history[key]:
+            del self.history[key]
+        self.history_bytes -= self._history_sizes.pop((key, version))
 
-3. Wrap your thought process in <analysis_planning> tags:
-   Analyze the dataset size and complexity:
-   - How many rows and columns does it have?
-   - Are there any potential computational challenges based on the data types or volume?
-   - What kind of questions would be appropriate given the dataset's characteristics and the analysis topic?
-   - How can we ensure that our questions won't result in excessively large outputs?
+    def __setitem__(self, key, value):
+        if super().get(key) is not value:
+            self._archive(key, value)
+        super().__setitem__(key, value)
+        self.versions[key] = next(self._counter)
 
-   Based on this analysis:
-   - List 10 potential questions related to the analysis topic
-   - Evaluate each question against the following criteria:
-     * Directly related to the analysis topic
-     * Can be answered with reasonable computational effort
-     * Will produce manageable result sizes
-     * Provides meaningful insights into the data
-   - Select the top 5 questions that best meet all criteria
+    def __delitem__(self, key):
+        self._archive(key)
+        super().__delitem__(key)
+        self.versions.pop(key, None)
 
-4. List the 5 questions you've selected, ensuring they meet the criteria outlined above.
+    def pop(self, key, *default):
+        self._archive(key)
+        self.versions.pop(key, None)
+        return super().pop(key, *default)
 
-5. For each question, follow these steps:
-   a. Wrap your thought process in <analysis_planning> tags:
-      - How can I structure the Python script to efficiently answer this question?
-      - What data preprocessing steps are necessary?
-      - How can I limit the output size to ensure stability?
-      - What type of visualization would best represent the results?
-      - Outline the main steps the script will follow
-   
-   b. Write a Python script to answer the question. Include comments explaining your approach and any measures taken to limit output size.
-   
-   c. Use the run_script tool to execute your Python script on the MCP server.
-   
-   d. Render the results returned by the run-script tool as a chart using plotly.js (prefer loading from cdnjs.cloudflare.com). Do not use react or recharts, and do not read the original CSV file directly. Provide the plotly.js code to generate the chart.
+    def popitem(self):
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+        key = next(reversed(self))
+        return key, self.pop(key)
 
-6. After completing the analysis for all 5 questions, provide a brief summary of your findings and any overarching insights gained from the data.
+    def clear(self):
+        super().clear()
+        self.versions.clear()
+        self.history.clear()
+        self._history_sizes.clear()
+        self.history_bytes = 0
 
-Remember to prioritize stability and manageability in your analysis. If at any point you encounter potential issues with large result sets, adjust your approach accordingly.
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
 
-Please begin your analysis by loading the CSV file and providing an initial exploration of the dataset.
-"""
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
 
+    def version(self, key, version: int):
+        """the value key had at version, which may be the current one"""
+        if key in self and self.versions[key] == version:
+            return self[key]
+        try:
+            return self.history.get(key, {})[version]
+        except KeyError:
+            raise KeyError(f"'{key}' has no version {version}") from None
 
-### Data Exploration Tools Description & Schema
-class DataExplorationTools(str, Enum):
-    LOAD_CSV = "load_csv"
-    RUN_SCRIPT = "run_script"
+    def previous_version(self, key) -> int:
+        """the version of key replaced most recently"""
+        kept = self.history.get(key)
+        if not kept:
+            raise KeyError(f"'{key}' has no earlier versions")
+        return next(reversed(kept))
 
+    def rollback(self, key, version: int):
+        """make an earlier version of key current again, under its original version number
 
-LOAD_CSV_TOOL_DESCRIPTION = """
-Load CSV File Tool
+        The value it replaces is kept in history like any other, so a rollback can be undone.
+        """
+        value = self.version(key, version)
+        if key in self and self.versions[key] == version:
+            return
+        self._forget(key, version)
+        self._archive(key, value)
+        super().__setitem__(key, value)
+        self.versions[key] = version
 
-Purpose:
-Load a local CSV file into a DataFrame.
 
-Usage Notes:
-	•	If a df_name is not provided, the tool will automatically assign names sequentially as df_1, df_2, and so on.
-"""
+def _column_change(old: pd.Series, new: pd.Series) -> Optional[str]:
+    """None if two columns hold the same values, otherwise a short description of the change
 
-class LoadCsv(BaseModel):
-    csv_path: str
-    df_name: Optional[str] = None
+    Columns that still share their buffer are recognised without comparing any values.
+    """
+    if old.dtype != new.dtype:
+        return f"{old.dtype} -> {new.dtype}"
+    if isinstance(old.values, np.ndarray) and isinstance(new.values, np.ndarray) \
+            and old.values.__array_interface__ == new.values.__array_interface__:
+        return None
+    if old.equals(new):
+        return None
+    changed = int((old.ne(new) & ~(old.isna() & new.isna())).sum())
+    return f"{changed} changed value{'s' if changed != 1 else ''}"
 
 
+def _shape(df) -> str:
+    return f"{df.shape[0]} rows x {df.shape[1]} columns" if isinstance(df, pd.DataFrame) else f"{len(df)} rows"
 
-RUN_SCRIPT_TOOL_DESCRIPTION = """
-Python Script Execution Tool
 
-Purpose:
-Execute Python scripts for specific data analytics tasks.
+def _diff_frames(old, new) -> list[str]:
+    """lines describing how one version of a dataframe (or series) differs from another"""
+    old = old.to_frame() if isinstance(old, pd.Series) else old
+    new = new.to_frame() if isinstance(new, pd.Series) else new
+    lines = [f"shape: {_shape(old)} -> {_shape(new)}"]
+    if not (old.columns.is_unique and new.columns.is_unique):
+        lines.append("values: " + ("unchanged" if old.equals(new) else "changed"))
+        return lines
+    if not old.index.equals(new.index):
+        if not (old.index.is_unique and new.index.is_unique):
+            lines.append("rows: changed (the index has duplicate labels, so values are not compared)")
+            new = new.iloc[:, :0]
+        else:
+            lines.append(f"rows: {len(old.index.difference(new.index))} removed, "
+                         f"{len(new.index.difference(old.index))} added (by index label)")
+            # columns are compared on the rows both versions have
+            common = old.index.intersection(new.index)
+            old, new = old.loc[common], new.loc[common]
+    added = [str(name) for name in new.columns if name not in old.columns]
+    removed = [str(name) for name in old.columns if name not in new.columns]
+    changed, unchanged = [], 0
+    for name in new.columns:
+        if name in old.columns:
+            change = _column_change(old[name], new[name])
+            if change is None:
+                unchanged += 1
+            else:
+                changed.append(f"{name} ({change})")
+    if added:
+        lines.append("added columns: " + ", ".join(added))
+    if removed:
+        lines.append("removed columns: " + ", ".join(removed))
+    if changed:
+        lines.append("changed columns: " + ", ".join(changed))
+    lines.append(f"unchanged columns: {unchanged}")
+    return lines
 
-Allowed Actions
-	1.	Print Results: Output will be displayed as the script’s stdout.
-	2.	[Optional] Save DataFrames: Store DataFrames in memory for future use by specifying a save_to_memory name.
 
-Prohibited Actions
-	1.	Overwriting Original DataFrames: Do not modify existing DataFrames to preserve their integrity for future tasks.
-	2.	Creating Charts: Chart generation is not permitted.
-"""
+### Script result cache
+def _result_size(std_out_script: str, saved: dict) -> int:
+    size = len(std_out_script)
+    for value in saved.values():
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            size += int(value.memory_usage(deep=True).sum()) if isinstance(value, pd.DataFrame) \
+                else int(value.memory_usage(deep=True))
+        else:
+            size += sys.getsizeof(value)
+    return size
+
+
+class ResultCache:
+    """in-memory LRU cache of script results (stdout and saved dataframes), bounded by their size
+
+    Keys combine the script's hash with the versions of the dataframes it reads, so any
+    change to an input makes earlier results unreachable; they age out of the LRU order.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: collections.OrderedDict[str, tuple] = collections.OrderedDict()
+        self._bytes = 0
+
+    @staticmethod
+    def key(script: str, inputs: dict[str, int], save_to_memory: Optional[List[str]]) -> str:
+        digest = hashlib.sha256(script.encode()).hexdigest()
+        return json.dumps([digest, sorted(inputs.items()), save_to_memory or []])
+
+    def get(self, key: str) -> Optional[tuple]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0], entry[1]
+
+    def put(self, key: str, std_out_script: str, saved: dict):
+        size = _result_size(std_out_script, saved)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[2]
+        self._entries[key] = (std_out_script, dict(saved), size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
 
-class RunScript(BaseModel):
-    script: str
-    save_to_memory: Optional[List[str]] = None
+
+@asynccontextmanager
+async def _heartbeat(progress: Optional[ProgressCallback], total: Optional[float]):
+    """report the seconds elapsed every PROGRESS_INTERVAL while the block runs"""
+    if progress is None:
+        yield
+        return
+
+    async def beat():
+        started = loop.time()
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            elapsed = loop.time() - started
+            progress(elapsed, total, f"Running for {elapsed:.0f}s" + (f" of at most {total:g}s" if total else ""))
+
+    loop = asyncio.get_running_loop()
+    task = asyncio.create_task(beat())
+    try:
+        yield
+    finally:
+        task.cancel()
+
+
+class ScriptExecutor(str, Enum):
+    THREAD = "thread"
+    PROCESS = "process"
 
 
 ### Python (Pandas, NumPy, SciPy) Script Runner
 class ScriptRunner:
-    def __init__(self):
-        self.data = {}
+    # seconds an aborted process-mode script gets to unwind before its worker is killed
+    ABORT_GRACE_PERIOD = 5.0
+
+    def __init__(
+        self,
+        executor: str = ScriptExecutor.THREAD,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None,
+        cache: Optional[DatasetCache] = None,
+        results: Optional[ResultCache] = None,
+        history_versions: int = HISTORY_VERSIONS,
+        history_max_mb: int = HISTORY_MAX_MB,
+    ):
+        self.data = VersionedData(max_history=history_versions, max_history_bytes=history_max_mb * 1024 * 1024)
+        self.tails: dict[str, _CsvTail] = {}
+        # source key -> [(df_name, weak reference to the dataframe)] for every load with that key
+        self._loads: dict[str, list[tuple]] = {}
         self.df_count = 0
         self.notes: list[str] = []
+        self.executor_kind = ScriptExecutor(executor)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.cache = cache
+        self.results = results
+        if memory_limit_mb and self.executor_kind != ScriptExecutor.PROCESS:
+            logger.warning("memory_limit_mb is only enforced with the process executor")
+        self._executor: Optional[concurrent.futures.Executor] = None
+        self._shared: dict[str, _SharedFrame] = {}
+        self._retired: list[_SharedFrame] = []
+        # (df_name, id(dataframe)) -> copy to shared memory in progress
+        self._publishing: dict[tuple, asyncio.Future] = {}
+        self._started_jobs = None
+        self._aborted_jobs = None
+        self._aborted_slot = 0
+        self._job_pids: dict[int, int] = {}
+        # process pools broken on purpose, by killing a worker that ignored an abort
+        self._killed_pools = weakref.WeakSet()
+
+    @property
+    def executor(self) -> concurrent.futures.Executor:
+        """worker pool used by safe_eval_async, created on first use"""
+        if self._executor is None:
+            if self.executor_kind == ScriptExecutor.PROCESS:
+                self._started_jobs = multiprocessing.SimpleQueue()
+                # ring buffer of aborted job ids, read by the workers' signal handler
+                self._aborted_jobs = multiprocessing.RawArray("q", 64)
+                self._aborted_slot = 0
+                self._job_pids.clear()
+                if os.name == "posix":
+                    # workers must share our resource tracker, or one exiting would unlink live segments
+                    resource_tracker.ensure_running()
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(self._started_jobs, self._aborted_jobs),
+                )
+                # start every worker now so the first scripts don't pay for process start-up
+                for _ in range(self.max_workers or os.cpu_count() or 1):
+                    self._executor.submit(_warm_worker)
+            else:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="script-runner"
+                )
+        return self._executor
+
+    def shutdown(self):
+        self._reset_executor()
+        for shared in [*self._shared.values(), *self._retired]:
+            shared.close()
+        self._shared.clear()
+        self._retired.clear()
+
+    async def _share_frames(self, names: Optional[set] = None) -> dict[str, _SharedFrame]:
+        """publish the dataframes named `names` (None: all) to shared memory and take a user on each
+
+        Frames are published the first time a script uses them and re-published only once
+        they change; published frames that were replaced or removed are retired. The caller
+        releases the frames again by decrementing their users.
+        """
+        taken = {}
+        try:
+            for df_name, df in self._frames(names).items():
+                shared = self._shared.get(df_name)
+                while shared is None or shared.df is not df or shared.closed:
+                    shared = await self._publish(df_name, df)
+                shared.users += 1
+                taken[df_name] = shared
+        except BaseException:
+            for shared in taken.values():
+                shared.users -= 1
+            raise
+        self._retire_frames()
+        return taken
+
+    async def _publish(self, df_name: str, df: pd.DataFrame) -> _SharedFrame:
+        """copy a frame to shared memory on a worker thread, so a large frame doesn't block the event loop
+
+        Concurrent scripts using the same frame wait for a single copy.
+        """
+        key = (df_name, id(df))
+        task = self._publishing.get(key)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(_SharedFrame, df))
+            self._publishing[key] = task
+            task.add_done_callback(functools.partial(self._store_published, key, df_name, df))
+        return await asyncio.shield(task)
 
-    def load_csv(self, csv_path: str, df_name:str = None):
+    def _store_published(self, key: tuple, df_name: str, df: pd.DataFrame, task: asyncio.Future):
+        # runs on the event loop as soon as the copy is done, even if every waiter was cancelled
+        self._publishing.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        shared = task.result()
+        current = self._shared.get(df_name)
+        if self._frames({df_name}).get(df_name) is df and (current is None or current.df is not df):
+            if current is not None:
+                self._retired.append(current)
+            self._shared[df_name] = shared
+        else:
+            # the name changed while the frame was being copied; it is closed once unused
+            self._retired.append(shared)
+
+    def _retire_frames(self):
+        """retire published frames that were replaced or removed, and close unused retired ones"""
+        frames = self._frames()
+        for df_name, shared in list(self._shared.items()):
+            if frames.get(df_name) is not shared.df:
+                self._retired.append(self._shared.pop(df_name))
+        # segments can only be unlinked once no in-flight script still needs to attach to them
+        for shared in [shared for shared in self._retired if shared.users == 0]:
+            self._retired.remove(shared)
+            shared.close()
+
+    def _next_df_name(self, df_name: Optional[str]) -> str:
         self.df_count += 1
-        if not df_name:
-            df_name = f"df_{self.df_count}"
+        return df_name or f"df_{self.df_count}"
+
+    def _find_load(self, key: str) -> Optional[tuple]:
+        """(df_name, dataframe) of an earlier load with this key that is still held unchanged"""
+        live = [(df_name, ref) for df_name, ref in self._loads.get(key, [])
+                if ref() is not None and self.data.get(df_name) is ref()]
+        if not live:
+            self._loads.pop(key, None)
+            return None
+        self._loads[key] = live
+        return live[0][0], live[0][1]()
+
+    def _record_load(self, key: str, df_name: str, df: pd.DataFrame):
+        self._loads.setdefault(key, []).append((df_name, weakref.ref(df)))
+
+    def _file_load(self, kind: str, reader, path: str, df_name: Optional[str], **options):
+        """split a load with a single-call reader into (read, store), registering it like load_csv does
+
+        As with _csv_load, read() only does the file I/O and parsing, so it may run on a worker
+        thread. options are the reader's settings; they only identify repeated loads of the same file.
+        """
+        df_name = self._next_df_name(df_name)
         try:
-            self.data[df_name] = pd.read_csv(csv_path)
-            self.notes.append(f"Successfully loaded CSV into dataframe '{df_name}'")
+            key = _source_key([path], kind=kind, **options)
+        except Exception as e:
+            raise McpError(
+                ErrorData(code=INTERNAL_ERROR, message=f"Error loading {kind}: {str(e)}")
+            ) from e
+        duplicate = self._find_load(key)
+
+        def read() -> tuple:
+            """(dataframe, message)"""
+            message = f"Successfully loaded {kind} into dataframe '{df_name}'"
+            if duplicate is not None:
+                # a shallow copy: its own frame object over the same column buffers
+                message += f" (shares data with '{duplicate[0]}', loaded from the same unchanged file)"
+                return duplicate[1].copy(deep=False), message
+            try:
+                return reader(path), message
+            except Exception as e:
+                raise McpError(
+                    ErrorData(code=INTERNAL_ERROR, message=f"Error loading {kind}: {str(e)}")
+                ) from e
+
+        def store(result: tuple):
+            df, message = result
+            self.data[df_name] = df
+            self._record_load(key, df_name, df)
+            self.tails.pop(df_name, None)
+            self.notes.append(message)
+            return [
+                TextContent(type="text", text=message)
+            ]
+
+        return read, store
+
+    def _parquet_load(self, parquet_path: str, df_name: str = None, columns: Optional[List[str]] = None,
+                      row_filter: Optional[str] = None):
+        return self._file_load(
+            "Parquet", lambda path: _read_parquet(path, columns, row_filter), parquet_path, df_name,
+            columns=columns, row_filter=row_filter,
+        )
+
+    def _feather_load(self, feather_path: str, df_name: str = None):
+        return self._file_load(
+            "Feather", lambda path: pyarrow.feather.read_table(path, memory_map=True).to_pandas(),
+            feather_path, df_name,
+        )
+
+    def _json_load(self, json_path: str, df_name: str = None):
+        return self._file_load(
+            "JSON", lambda path: pd.read_json(path, lines=True, engine="pyarrow"), json_path, df_name
+        )
+
+    def load_parquet(self, parquet_path: str, df_name: str = None, **options):
+        read, store = self._parquet_load(parquet_path, df_name, **options)
+        return store(read())
+
+    async def load_parquet_async(self, parquet_path: str, df_name: str = None, **options):
+        read, store = self._parquet_load(parquet_path, df_name, **options)
+        return store(await asyncio.to_thread(read))
+
+    def load_feather(self, feather_path: str, df_name: str = None):
+        read, store = self._feather_load(feather_path, df_name)
+        return store(read())
+
+    async def load_feather_async(self, feather_path: str, df_name: str = None):
+        read, store = self._feather_load(feather_path, df_name)
+        return store(await asyncio.to_thread(read))
+
+    def load_json(self, json_path: str, df_name: str = None):
+        read, store = self._json_load(json_path, df_name)
+        return store(read())
+
+    async def load_json_async(self, json_path: str, df_name: str = None):
+        read, store = self._json_load(json_path, df_name)
+        return store(await asyncio.to_thread(read))
+
+    def load_excel(self, excel_path: str, sheets: Optional[List[str]] = None, df_name: str = None, **options):
+        """load sheets of a workbook, parsing only the ones that are not cached for its current version"""
+        read, store = self._excel_load(excel_path, sheets, df_name, **options)
+        return store(read())
+
+    async def load_excel_async(self, excel_path: str, sheets: Optional[List[str]] = None, df_name: str = None,
+                               **options):
+        """load_excel with the workbook read (and the sheet cache used) on a worker thread"""
+        read, store = self._excel_load(excel_path, sheets, df_name, **options)
+        return store(await asyncio.to_thread(read))
+
+    def _excel_load(self, excel_path: str, sheets: Optional[List[str]] = None, df_name: str = None,
+                    header: int = 0, use_cache: bool = True):
+        """split an Excel load into (read, store), like _csv_load"""
+
+        def read() -> tuple:
+            """(sheet names, sheet -> dataframe, sheets read from the cache, sheet -> note)"""
+            try:
+                names = sheets
+                if not names:
+                    with pd.ExcelFile(excel_path) as workbook:
+                        names = workbook.sheet_names
+                frames, keys = {}, {}
+                if self.cache is not None and use_cache:
+                    for sheet in names:
+                        keys[sheet] = self.cache.key(excel_path, kind="Excel", sheet=sheet, header=header)
+                        df = self.cache.get(keys[sheet])
+                        if df is not None:
+                            frames[sheet] = df
+                cached = set(frames)
+                missing = [sheet for sheet in names if sheet not in frames]
+                notes = {}
+                if missing:
+                    # one call opens the workbook once for all the sheets it parses
+                    parsed = pd.read_excel(excel_path, sheet_name=missing, header=header)
+                    for sheet in missing:
+                        # converted on every parse, so a sheet has the same dtypes with or without the cache
+                        frames[sheet], mixed = _mixed_columns_as_text(parsed[sheet])
+                        if mixed:
+                            notes[sheet] = " (mixed-type columns stored as text: " + ", ".join(mixed) + ")"
+                        if sheet in keys and not self.cache.put(keys[sheet], frames[sheet]):
+                            notes[sheet] = notes.get(sheet, "") + " (not cached, so it is parsed again on every load)"
+            except Exception as e:
+                raise McpError(
+                    ErrorData(code=INTERNAL_ERROR, message=f"Error loading Excel: {str(e)}")
+                ) from e
+            return names, frames, cached, notes
+
+        def store(result: tuple):
+            names, frames, cached, notes = result
+            loaded = []
+            for sheet in names:
+                if df_name and len(names) > 1:
+                    suffix = re.sub(r"\W+", "_", sheet).strip("_")
+                    sheet_df_name = self._next_df_name(f"{df_name}_{suffix}")
+                else:
+                    sheet_df_name = self._next_df_name(df_name)
+                self.data[sheet_df_name] = frames[sheet]
+                self.tails.pop(sheet_df_name, None)
+                df = frames[sheet]
+                loaded.append(f"  '{sheet_df_name}': sheet '{sheet}', {len(df):,} rows x {len(df.columns)} columns"
+                              + (" (from cache)" if sheet in cached else notes.get(sheet, "")))
+            message = "Successfully loaded Excel sheets into dataframes:\n" + "\n".join(loaded)
+            self.notes.append(message)
             return [
-                TextContent(type="text", text=f"Successfully loaded CSV into dataframe '{df_name}'")
+                TextContent(type="text", text=message)
             ]
+
+        return read, store
+
+    def load_csv(self, csv_path: str, df_name: str = None, **options):
+        """load one or more CSVs; `progress(bytes_read, total_bytes, message)` is called while they are parsed"""
+        read, store = self._csv_load(csv_path, df_name, **options)
+        return store(read())
+
+    async def load_csv_async(self, csv_path: str, df_name: str = None, **options):
+        """load_csv with the files read on a worker thread
+
+        Like safe_eval_async, only the parsing leaves the event loop thread: the dataframe,
+        its tail and the notes are stored back on it.
+        """
+        read, store = self._csv_load(csv_path, df_name, **options)
+        return store(await asyncio.to_thread(read))
+
+    def _csv_load(self, csv_path: str, df_name:str = None, chunksize: Optional[int] = None,
+                  optimize: bool = False, engine: str = CsvEngine.C, use_cache: bool = True,
+                  columns: Optional[List[str]] = None, row_filter: Optional[str] = None,
+                  lazy: bool = False, source_column: Optional[str] = None, sample: Optional[int] = None,
+                  sample_method: str = SampleMethod.HEAD, stratify_by: Optional[str] = None, background: bool = False,
+                  detect_dates: bool = True, report: bool = False,
+                  progress: Optional[ProgressCallback] = None):
+        """split a CSV load into (read, store): store(read()) loads the CSV
+
+        read() does the file I/O and parsing without touching ScriptRunner state, so it may run
+        on a worker thread; store() records the result.
+        """
+        df_name = self._next_df_name(df_name)
+        try:
+            read_options = {"engine": CsvEngine(engine).value}
+            if engine == CsvEngine.PYARROW:
+                # keep the parsed Arrow columns instead of converting them to NumPy/object columns
+                read_options["dtype_backend"] = "pyarrow"
+            if lazy and (sample or background):
+                raise ValueError("lazy cannot be combined with sample or background")
+            csv_paths = _resolve_csv_paths(csv_path)
+            sampled = sample and not background
+            tail = None
+            if len(csv_paths) == 1 and not source_column and not sampled and _compression(csv_paths[0]) is None:
+                tail = _CsvTail(csv_paths[0], columns, row_filter, read_options)
+            key = duplicate = None
+            if not (lazy or background):
+                key = _source_key(csv_paths, kind="CSV", chunksize=chunksize, optimize=optimize, columns=columns,
+                                  row_filter=row_filter, source_column=source_column, sample=sample,
+                                  sample_method=SampleMethod(sample_method).value, stratify_by=stratify_by,
+                                  detect_dates=detect_dates, **read_options)
+                duplicate = self._find_load(key)
+                if duplicate is not None:
+                    original_tail = self.tails.get(duplicate[0])
+                    tail = copy.copy(original_tail) if original_tail is not None else None
         except Exception as e:
             raise McpError(
-                INTERNAL_ERROR, f"Error loading CSV: {str(e)}"
+                ErrorData(code=INTERNAL_ERROR, message=f"Error loading CSV: {str(e)}")
             ) from e
 
-    def safe_eval(self, script: str, save_to_memory: Optional[List[str]] = None):
-        """safely run a script, return the result if valid, otherwise return the error message"""
-        # first extract dataframes from the self.data
-        local_dict = {
-            **{df_name: df for df_name, df in self.data.items()},
+        def parse(load_progress: Optional[LoadProgress] = None):
+            if sampled:
+                df, details, _ = self._sample_csvs(csv_paths, sample, sample_method, stratify_by, optimize,
+                                                   columns, row_filter, source_column, load_progress, read_options,
+                                                   detect_dates=detect_dates)
+                return df, details
+            limit = tail.mark() if tail is not None else None
+            return self._parse_csvs(csv_paths, chunksize, optimize, use_cache, columns, row_filter,
+                                    read_options, source_column, load_progress, detect_dates=detect_dates,
+                                    limit=limit)
+
+        def read() -> tuple:
+            """(value to store under df_name, message, whether it is a new full load to record)"""
+            try:
+                if lazy:
+                    sniff_options = {"usecols": columns} if columns else {}
+                    if engine == CsvEngine.PYARROW:
+                        sniff_options["dtype_backend"] = "pyarrow"
+                    dtypes, row_estimate = _sniff_csv(csv_paths, detect_dates, **sniff_options)
+                    handle = LazyDataset(lambda: parse()[0], dtypes, row_estimate)
+                    message = (f"Registered CSV as lazy dataframe '{df_name}', loaded when a script first uses it: "
+                               f"{handle.describe()}")
+                    if row_filter:
+                        message += "\n(row estimate is before applying row_filter)"
+                    if report:
+                        message += "\n(no ingestion report: the file is parsed when a script first uses it)"
+                    return handle, message, False
+                if background:
+                    size = sample or BACKGROUND_SAMPLE_ROWS
+                    limit = tail.mark() if tail is not None else None
+                    df, details, complete = self._sample_csvs(csv_paths, size, sample_method, stratify_by, optimize,
+                                                              columns, row_filter, source_column, None, read_options,
+                                                              detect_dates=detect_dates, limit=limit)
+                    details += _datetime_details(df)
+                    if complete:
+                        value = df
+                        message = (f"Successfully loaded CSV into dataframe '{df_name}' "
+                                   f"(all {len(df):,} rows fit in the sample)")
+                    else:
+                        value = BackgroundDataset(lambda: parse()[0], df)
+                        message = (f"Loaded a sample of CSV into dataframe '{df_name}'{details}; the full file is "
+                                   f"loading in the background. Scripts using '{df_name}' wait for it unless run "
+                                   f"with use_samples.")
+                    if report:
+                        message += "\n(no ingestion report for background loads)"
+                    return value, message, False
+                if duplicate is not None:
+                    original_name, original = duplicate
+                    # a shallow copy: its own frame object over the same column buffers
+                    df = original.copy(deep=False)
+                    details = f" (shares data with '{original_name}', loaded from the same unchanged file)"
+                    if report:
+                        details += _ingestion_report(df, 0, None, None, engine, chunksize, optimize, columns)
+                else:
+                    input_bytes = sum(_source_size(path) for path in csv_paths)
+                    load_progress = LoadProgress(input_bytes, progress) if progress is not None else None
+                    with _PeakRss() if report else nullcontext() as rss:
+                        started = time.monotonic()
+                        df, details = parse(load_progress)
+                        seconds = time.monotonic() - started
+                    if load_progress is not None:
+                        details += f" ({load_progress.finish()})"
+                    details += _datetime_details(df)
+                    if report:
+                        details += _ingestion_report(df, input_bytes, seconds, rss.delta, engine, chunksize,
+                                                     optimize, columns)
+                return df, f"Successfully loaded CSV into dataframe '{df_name}'{details}", True
+            except Exception as e:
+                raise McpError(
+                    ErrorData(code=INTERNAL_ERROR, message=f"Error loading CSV: {str(e)}")
+                ) from e
+
+        def store(result: tuple):
+            value, message, record = result
+            self.data[df_name] = value
+            if record:
+                self._record_load(key, df_name, value)
+            if tail is not None:
+                self.tails[df_name] = tail
+            else:
+                self.tails.pop(df_name, None)
+            self.notes.append(message)
+            return [
+                TextContent(type="text", text=message)
+            ]
+
+        return read, store
+
+    def refresh_csv(self, df_name: str):
+        """append the rows added to a loaded CSV since it was last read"""
+        self._materialize({df_name})
+        read, store = self._csv_refresh(df_name)
+        return store(read())
+
+    async def refresh_csv_async(self, df_name: str):
+        """refresh_csv with the appended rows parsed and concatenated on a worker thread"""
+        await self._materialize_async({df_name})
+        read, store = self._csv_refresh(df_name)
+        return store(await asyncio.to_thread(read))
+
+    def _csv_refresh(self, df_name: str):
+        """split a refresh into (read, store), like _csv_load
+
+        read() works on a copy of the tail and returns the new dataframe; store() keeps both,
+        unless the dataframe or its tail changed in the meantime.
+        """
+        tail = self.tails.get(df_name)
+        if tail is None:
+            raise McpError(
+                ErrorData(code=INTERNAL_ERROR, message=f"Error refreshing CSV: '{df_name}' was not loaded from a "
+                                                        "single uncompressed CSV file")
+            )
+        existing = self.data[df_name]
+        refreshed_tail = copy.copy(tail)
+
+        def read() -> tuple:
+            """(refreshed dataframe, or None if nothing was appended, message)"""
+            try:
+                result = refreshed_tail.read_appended()
+            except Exception as e:
+                raise McpError(
+                    ErrorData(code=INTERNAL_ERROR, message=f"Error refreshing CSV: {str(e)}")
+                ) from e
+            appended, replaced = result if result is not None else (None, 0)
+            if appended is None or (appended.empty and not replaced):
+                return None, f"No new rows in '{tail.csv_path}' for dataframe '{df_name}'"
+            # rows parsed from a last line that had no newline are read again with the rest
+            kept = existing.iloc[:len(existing) - replaced]
+            dates = [name for name, dtype in kept.dtypes.items()
+                     if pd.api.types.is_datetime64_any_dtype(dtype) and name in appended.columns]
+            appended, _ = _parse_datetime_columns(appended, dates)
+            df = _concat_frames([kept, _conform_appended(kept.dtypes, appended)])
+            message = f"Appended {len(appended) - replaced} new rows to dataframe '{df_name}' ({len(df)} rows in total)"
+            if replaced:
+                message += "\n(re-read its last line, which had no newline when it was last read)"
+            return df, message
+
+        def store(result: tuple):
+            df, message = result
+            if self.tails.get(df_name) is not tail or self.data.get(df_name) is not existing:
+                raise McpError(
+                    ErrorData(code=INTERNAL_ERROR, message=f"Error refreshing CSV: '{df_name}' changed while it was "
+                                                            "being refreshed; refresh it again")
+                )
+            self.tails[df_name] = refreshed_tail
+            if df is not None:
+                self.data[df_name] = df
+            self.notes.append(message)
+            return [
+                TextContent(type="text", text=message)
+            ]
+
+        return read, store
+
+    def _versions_text(self, df_name: str) -> str:
+        current = self.data.versions.get(df_name)
+        kept = sorted([*self.data.history.get(df_name, {}), *([current] if current is not None else [])])
+        return ", ".join(f"{version}{' (current)' if version == current else ''}" for version in kept)
+
+    def diff_dataframe(self, df_name: str, version: Optional[int] = None, against: Optional[int] = None):
+        """describe how a kept version of a dataframe differs from another (by default the current one)"""
+        try:
+            if version is None:
+                version = self.data.previous_version(df_name)
+            if against is None:
+                if df_name not in self.data:
+                    raise KeyError(f"'{df_name}' has no current version")
+                self._materialize({df_name})
+                against = self.data.versions[df_name]
+            old, new = self.data.version(df_name, version), self.data.version(df_name, against)
+        except KeyError as e:
+            raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Error diffing dataframe: {e.args[0]}")) from e
+        if not all(isinstance(df, (pd.DataFrame, pd.Series)) for df in (old, new)):
+            raise McpError(
+                ErrorData(code=INTERNAL_ERROR, message=f"Error diffing dataframe: '{df_name}' is not a DataFrame")
+            )
+        lines = [f"Versions of dataframe '{df_name}': {self._versions_text(df_name)}",
+                 f"Changes from version {version} to version {against}:"]
+        lines += [f"\t{line}" for line in _diff_frames(old, new)]
+        message = "\n".join(lines)
+        self.notes.append(message)
+        return [
+            TextContent(type="text", text=message)
+        ]
+
+    def rollback_dataframe(self, df_name: str, version: Optional[int] = None):
+        """make an earlier version of a dataframe current again"""
+        try:
+            if version is None:
+                version = self.data.previous_version(df_name)
+            self.data.rollback(df_name, version)
+        except KeyError as e:
+            raise McpError(
+                ErrorData(code=INTERNAL_ERROR, message=f"Error rolling back dataframe: {e.args[0]}")
+            ) from e
+        # appended rows were read relative to the version being replaced
+        self.tails.pop(df_name, None)
+        message = (f"Rolled back dataframe '{df_name}' to version {version} ({_shape(self.data[df_name])}); "
+                   f"versions: {self._versions_text(df_name)}")
+        self.notes.append(message)
+        return [
+            TextContent(type="text", text=message)
+        ]
+
+    def _parse_csvs(self, csv_paths: list[str], chunksize: Optional[int], optimize: bool, use_cache: bool,
+                    columns: Optional[List[str]], row_filter: Optional[str], read_options: dict,
+                    source_column: Optional[str] = None, progress: Optional[LoadProgress] = None,
+                    detect_dates: bool = False, limit: Optional[int] = None):
+        """parse one or more CSVs into a single dataframe, returning it and notes for the result
+
+        Several files are parsed concurrently and cached one by one, so reloading a set of
+        shards only parses the shards that are new or changed. `limit` caps the bytes read
+        from a single uncompressed file.
+        """
+        if len(csv_paths) == 1 and not source_column:
+            return self._parse_csv(csv_paths[0], chunksize, optimize, use_cache, columns, row_filter, read_options,
+                                   progress, detect_dates, limit)
+        with concurrent.futures.ThreadPoolExecutor(thread_name_prefix="csv-loader") as pool:
+            results = list(pool.map(
+                lambda path: self._parse_csv(path, chunksize, False, use_cache, columns, row_filter, read_options,
+                                             progress, detect_dates),
+                csv_paths,
+            ))
+        frames = [df for df, _ in results]
+        if source_column:
+            frames = [
+                df.assign(**{source_column: pd.Categorical.from_codes(np.full(len(df), index), categories=csv_paths)})
+                for index, df in enumerate(frames)
+            ]
+        df = _concat_frames(frames)
+        cached = sum(details == " (from cache)" for _, details in results)
+        details = f" from {len(csv_paths)} files" + (f" ({cached} from cache)" if cached else "")
+        if optimize:
+            df, optimize_details = _optimize_with_report(df)
+            details += optimize_details
+        return df, details
+
+    def _sample_csvs(self, csv_paths: list[str], size: int, method: str, stratify_by: Optional[str], optimize: bool,
+                     columns: Optional[List[str]], row_filter: Optional[str], source_column: Optional[str],
+                     progress: Optional[LoadProgress], read_options: dict, detect_dates: bool = False,
+                     limit: Optional[int] = None):
+        """a sample of the CSVs (never cached), returning it, notes for the result and whether it holds every row"""
+        df, rows_seen = _sample_csvs(csv_paths, size, method, stratify_by, columns, row_filter, source_column,
+                                     progress, read_options, limit)
+        if detect_dates:
+            df, _ = _parse_datetime_columns(df)
+        if rows_seen is None:
+            details = f" (sample of the first {len(df):,} rows)"
+            complete = len(df) < size
+        else:
+            details = f" ({SampleMethod(method).value} sample of {len(df):,} out of {rows_seen:,} rows)"
+            complete = rows_seen <= size
+        if optimize:
+            df, optimize_details = _optimize_with_report(df)
+            details += optimize_details
+        return df, details, complete
+
+    def _parse_csv(self, csv_path: str, chunksize: Optional[int], optimize: bool, use_cache: bool,
+                   columns: Optional[List[str]], row_filter: Optional[str], read_options: dict,
+                   progress: Optional[LoadProgress] = None, detect_dates: bool = False, limit: Optional[int] = None):
+        """parse a CSV (or fetch it from the cache), returning the dataframe and notes for the result"""
+        details = ""
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self.cache.key(csv_path, chunksize=chunksize, optimize=optimize, columns=columns,
+                                       row_filter=row_filter, detect_dates=detect_dates, limit=limit, **read_options)
+            df = self.cache.get(cache_key)
+            if df is not None:
+                if progress is not None:
+                    progress.read(_source_size(csv_path))
+                    progress.parsed(len(df))
+                return df, " (from cache)"
+        df = _read_csv(csv_path, chunksize, columns, row_filter, progress, limit, **dict(read_options))
+        if detect_dates:
+            # parsed once here, so the cached copy already holds datetime64 columns
+            df, _ = _parse_datetime_columns(df)
+        if optimize:
+            df, details = _optimize_with_report(df)
+        if cache_key is not None:
+            self.cache.put(cache_key, df)
+        return df, details
+
+    def _frames(self, names: Optional[set] = None) -> dict:
+        """loaded dataframes among `names` (None: all), leaving out lazy datasets not loaded yet
+
+        Datasets still loading in the background are represented by their samples.
+        """
+        return {
+            df_name: df.sample if isinstance(df, BackgroundDataset) else df
+            for df_name, df in self.data.items()
+            if (names is None or df_name in names)
+            and (isinstance(df, BackgroundDataset) or not isinstance(df, LazyDataset))
+        }
+
+    def script_datasets(self, script: str) -> list[str]:
+        """datasets a script refers to, known before it runs (all of them if it may look names up dynamically)"""
+        names = _script_names(script)
+        return [df_name for df_name in self.data if names is None or df_name in names]
+
+    def _script_frames(self, names: Optional[set] = None) -> dict:
+        """dataframes as handed to a script: shallow copies, as in the process workers
+
+        Together with copy-on-write, anything a script changes in place (values, added or
+        dropped columns) never shows up in self.data, or in other names loaded from the same
+        file, unless the script saves the frame.
+        """
+        return {
+            df_name: df.copy(deep=False) if isinstance(df, (pd.DataFrame, pd.Series)) else df
+            for df_name, df in self._frames(names).items()
         }
-        # execute the script and return the result and if there is error, return the error message
+
+    def _lazy_names(self, names: Optional[set], use_samples: bool = False) -> list[str]:
+        """datasets to load before running a script that uses `names` (None: any name)
+
+        Finished background loads are swapped in even when unused, since that costs nothing,
+        but one that failed is only loaded (raising its error) for scripts that use it.
+        """
+        lazy_names = []
+        for df_name, df in self.data.items():
+            if not isinstance(df, LazyDataset):
+                continue
+            background = isinstance(df, BackgroundDataset)
+            used = names is None or df_name in names
+            if background and df.ready:
+                if used or not df.failed:
+                    lazy_names.append(df_name)
+            elif used and not (background and use_samples):
+                lazy_names.append(df_name)
+        return lazy_names
+
+    def _sampled_names(self, names: Optional[set]) -> list[str]:
+        """datasets a script that uses `names` gets as samples because their background load is still running"""
+        return [df_name for df_name, df in self.data.items()
+                if isinstance(df, BackgroundDataset) and (names is None or df_name in names)]
+
+    def _store_materialized(self, df_name: str, handle: LazyDataset, df: pd.DataFrame):
+        # the name may have been reassigned while the dataset was loading
+        if self.data.get(df_name) is handle:
+            self.data[df_name] = df
+            if isinstance(handle, BackgroundDataset):
+                self.notes.append(f"Finished loading dataframe '{df_name}' in the background")
+            else:
+                self.notes.append(f"Loaded lazy dataframe '{df_name}'")
+
+    def _materialize(self, names: Optional[set], use_samples: bool = False):
+        for df_name in self._lazy_names(names, use_samples):
+            handle = self.data[df_name]
+            try:
+                df = handle.load()
+            except Exception as e:
+                raise McpError(
+                    ErrorData(code=INTERNAL_ERROR, message=f"Error loading dataframe '{df_name}': {str(e)}")
+                ) from e
+            self._store_materialized(df_name, handle, df)
+
+    async def _materialize_async(self, names: Optional[set], use_samples: bool = False):
+        for df_name in self._lazy_names(names, use_samples):
+            handle = self.data[df_name]
+            try:
+                df = await asyncio.to_thread(handle.load)
+            except Exception as e:
+                raise McpError(
+                    ErrorData(code=INTERNAL_ERROR, message=f"Error loading dataframe '{df_name}': {str(e)}")
+                ) from e
+            self._store_materialized(df_name, handle, df)
+
+    def _used_names(self, script: str) -> Optional[frozenset]:
+        """names the script refers to (None: any name), noting which datasets it uses"""
+        datasets = self.script_datasets(script)
+        self.notes.append("Script uses dataframes: " + (", ".join(f"'{df_name}'" for df_name in datasets) or "none"))
+        return _script_names(script)
+
+    def _result_key(self, script: str, save_to_memory: Optional[List[str]], memoize: bool) -> Optional[str]:
+        """key of the script's result for the current versions of the dataframes it reads"""
+        if not memoize or self.results is None:
+            return None
+        names = _compile_script(script).inputs
+        versions = self.data.versions
+        inputs = dict(versions) if names is None else {name: versions[name] for name in names if name in versions}
+        return self.results.key(script, inputs, save_to_memory)
+
+    def safe_eval(self, script: str, save_to_memory: Optional[List[str]] = None, use_samples: bool = False,
+                  memoize: bool = False):
+        """safely run a script, return the result if valid, otherwise return the error message"""
+        self.notes.append(f"Running script: \n{script}")
+        names = self._used_names(script)
+        self._materialize(names, use_samples)
+        sampled = self._sampled_names(names)
+        result_key = self._result_key(script, save_to_memory, memoize)
+        cached = self.results.get(result_key) if result_key else None
+        if cached is not None:
+            return self._finish_script(*cached, sampled, save_to_memory, memoized=True)
         try:
-            stdout_capture = StringIO()
-            old_stdout = sys.stdout
-            sys.stdout = stdout_capture
-            self.notes.append(f"Running script: \n{script}")
-            # pylint: disable=exec-used
-            exec(script, \
-                {'pd': pd, 'np': np, 'scipy': scipy, 'sklearn': sklearn, 'statsmodels': sm}, \
-                local_dict)
-            std_out_script = stdout_capture.getvalue()
-        except Exception as e:
-            raise McpError(INTERNAL_ERROR, f"Error running script: {str(e)}") from e
+            std_out_script, saved = _exec_script(script, self._script_frames(names), save_to_memory)
+        except ScriptExecutionError as e:
+            raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Error running script: {str(e)}")) from e
+        if result_key:
+            self.results.put(result_key, std_out_script, saved)
+        return self._finish_script(std_out_script, saved, sampled, save_to_memory)
 
+    async def safe_eval_async(
+        self, script: str, save_to_memory: Optional[List[str]] = None, timeout: Optional[float] = None,
+        progress: Optional[ProgressCallback] = None, use_samples: bool = False,
+        memoize: bool = False,
+    ):
+        """run safe_eval's work on the configured executor so the event loop stays responsive
+
+        The dataframes are snapshotted and results are written back on the event loop thread,
+        so concurrent scripts never mutate self.data from a worker. A script that times out or
+        whose request is cancelled is interrupted and leaves self.data untouched.
+        While it runs, `progress(elapsed_seconds, timeout, message)` is called every PROGRESS_INTERVAL.
+        """
+        self.notes.append(f"Running script: \n{script}")
+        timeout = timeout or self.timeout
+        async with _heartbeat(progress, timeout):
+            return await self._run_script_async(script, save_to_memory, timeout, use_samples, memoize)
+
+    async def _run_script_async(self, script: str, save_to_memory: Optional[List[str]], timeout: Optional[float],
+                                use_samples: bool, memoize: bool):
+        names = self._used_names(script)
+        await self._materialize_async(names, use_samples)
+        sampled = self._sampled_names(names)
+        result_key = self._result_key(script, save_to_memory, memoize)
+        cached = self.results.get(result_key) if result_key else None
+        if cached is not None:
+            return self._finish_script(*cached, sampled, save_to_memory, memoized=True)
+        job = _ScriptJob()
+        shared = await self._share_frames(names) if self.executor_kind == ScriptExecutor.PROCESS else {}
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout else None
+        try:
+            while True:
+                executor = self.executor
+                if self.executor_kind == ScriptExecutor.PROCESS:
+                    descriptors = {df_name: frame.descriptor for df_name, frame in shared.items()}
+                    published = {frame.shm.name for frame in self._shared.values()}
+                    future = executor.submit(
+                        _exec_script_shared, job.id, script, descriptors, published, save_to_memory,
+                        self.memory_limit_mb
+                    )
+                else:
+                    future = executor.submit(
+                        _exec_script_in_thread, job, script, self._script_frames(names), save_to_memory
+                    )
+                remaining = None if deadline is None else max(0.0, deadline - loop.time())
+                try:
+                    std_out_script, saved = await asyncio.wait_for(asyncio.wrap_future(future), remaining)
+                    break
+                except concurrent.futures.BrokenExecutor:
+                    if executor not in self._killed_pools:
+                        raise
+                    # killing another script's worker broke the whole pool; run this one again on a new pool
+                    logger.info(f"Restarting script job {job.id} after its worker pool was replaced")
+        except asyncio.TimeoutError as e:
+            self._abort(job, future)
+            self.notes.append(f"Script timed out after {timeout} seconds")
+            raise McpError(
+                ErrorData(code=INTERNAL_ERROR, message=f"Error running script: timed out after {timeout} seconds")
+            ) from e
+        except asyncio.CancelledError:
+            self._abort(job, future)
+            self.notes.append("Script cancelled")
+            raise
+        except ScriptExecutionError as e:
+            raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Error running script: {str(e)}")) from e
+        except concurrent.futures.BrokenExecutor as e:
+            # a worker died (crash or OOM kill); replace the pool and keep the server running
+            self._reset_executor(executor)
+            raise McpError(
+                ErrorData(code=INTERNAL_ERROR, message="Error running script: worker process exited unexpectedly")
+            ) from e
+        finally:
+            for frame in shared.values():
+                frame.users -= 1
+            if self.executor_kind == ScriptExecutor.PROCESS and self._executor is not None:
+                self._poll_started_jobs()
+                if not job.aborted:
+                    # an aborted job keeps its pid until _abort_process_job sees it finish or kills it
+                    self._job_pids.pop(job.id, None)
+        if result_key:
+            self.results.put(result_key, std_out_script, saved)
+        return self._finish_script(std_out_script, saved, sampled, save_to_memory)
+
+    def _reset_executor(self, broken: Optional[concurrent.futures.Executor] = None, cancel_futures: bool = True):
+        """shut the pool down so the next call starts a fresh one
+
+        When `broken` is given, only reset if that pool is still the current one, so scripts
+        failing on an already replaced pool don't tear down its replacement.
+        """
+        if self._executor is not None and broken in (None, self._executor):
+            self._executor.shutdown(wait=False, cancel_futures=cancel_futures)
+            self._executor = None
+
+    def _poll_started_jobs(self):
+        while not self._started_jobs.empty():
+            job_id, pid = self._started_jobs.get()
+            self._job_pids[job_id] = pid
+
+    def _abort(self, job: _ScriptJob, future: concurrent.futures.Future):
+        """interrupt a running script; queued scripts are simply cancelled"""
+        if future.cancel():
+            return
+        if self.executor_kind == ScriptExecutor.PROCESS:
+            job.aborted = True
+            self._aborted_jobs[self._aborted_slot % len(self._aborted_jobs)] = job.id
+            self._aborted_slot += 1
+            self._abort_process_job(job, future)
+            return
+        with job.lock:
+            job.aborted = True
+            if job.thread_id is not None:
+                # delivered at the next bytecode boundary, i.e. once the current pandas call returns
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                    ctypes.c_ulong(job.thread_id), ctypes.py_object(ScriptAborted)
+                )
+
+    def _abort_process_job(self, job: _ScriptJob, future: concurrent.futures.Future):
+        """signal the worker running the job, and kill it if it is still busy after the grace period"""
+        if future.done() or self._executor is None:
+            self._job_pids.pop(job.id, None)
+            return
+        self._poll_started_jobs()
+        pid = self._job_pids.get(job.id)
+        if pid is not None:
+            if not job.signalled and hasattr(signal, "SIGUSR1"):
+                os.kill(pid, signal.SIGUSR1)
+                job.signalled = True
+            else:
+                logger.warning(f"Killing worker process {pid} running an aborted script")
+                os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+                self._job_pids.pop(job.id, None)
+                # scripts queued or running on the pool fail with BrokenProcessPool and are resubmitted
+                self._killed_pools.add(self._executor)
+                self._reset_executor(cancel_futures=False)
+                return
+        asyncio.get_running_loop().call_later(
+            self.ABORT_GRACE_PERIOD, self._abort_process_job, job, future
+        )
+
+    def _finish_script(self, std_out_script: str, saved: dict, sampled: Optional[List[str]] = None,
+                       save_to_memory: Optional[List[str]] = None, memoized: bool = False):
         # check if the result is a dataframe
-        if save_to_memory:
-            for df_name in save_to_memory:
-                self.notes.append(f"Saving dataframe '{df_name}' to memory")
-                self.data[df_name] = local_dict.get(df_name)
+        for df_name, df in saved.items():
+            self.notes.append(f"Saving dataframe '{df_name}' to memory")
+            self.data[df_name] = df
+            self.tails.pop(df_name, None)
 
         output = std_out_script if std_out_script else "No output"
+        if sampled:
+            output += ("\n(ran on samples of " + ", ".join(f"'{df_name}'" for df_name in sampled) +
+                       ": their full loads are still running in the background)")
+        unsaved = [df_name for df_name in save_to_memory or [] if df_name not in saved]
+        if unsaved:
+            output += ("\n(not saved: the script does not define " +
+                       ", ".join(f"'{df_name}'" for df_name in unsaved) + ")")
+        if memoized:
+            output += "\n(memoized result: the script already ran against the same versions of its inputs)"
         self.notes.append(f"Result: {output}")
         return [
             TextContent(type="text", text=f"print out result: {output}")
@@ -207,9 +2962,79 @@ def safe_eval(self, script: str, save_to_memory: Optional[List[str]] = None):
 
 ### MCP Server Definition
 async def main():
-    script_runner = ScriptRunner()
+    max_workers = os.environ.get("MCP_DS_MAX_WORKERS")
+    timeout = os.environ.get("MCP_DS_SCRIPT_TIMEOUT")
+    memory_limit_mb = os.environ.get("MCP_DS_MEMORY_LIMIT_MB")
+    cache_max_mb = int(os.environ.get("MCP_DS_CACHE_MAX_MB", 2048))
+    result_cache_mb = int(os.environ.get("MCP_DS_RESULT_CACHE_MB", 256))
+    history_versions = int(os.environ.get("MCP_DS_HISTORY_VERSIONS", HISTORY_VERSIONS))
+    history_max_mb = int(os.environ.get("MCP_DS_HISTORY_MAX_MB", HISTORY_MAX_MB))
+    cache = None
+    if cache_max_mb > 0:
+        cache_dir = os.environ.get(
+            "MCP_DS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mcp-server-ds")
+        )
+        try:
+            cache = DatasetCache(cache_dir, cache_max_mb * 1024 * 1024)
+        except OSError as e:
+            logger.warning(f"Dataset cache disabled, cannot use {cache_dir}: {e}")
+    script_runner = ScriptRunner(
+        executor=os.environ.get("MCP_DS_EXECUTOR", ScriptExecutor.THREAD),
+        max_workers=int(max_workers) if max_workers else None,
+        timeout=float(timeout) if timeout else None,
+        memory_limit_mb=int(memory_limit_mb) if memory_limit_mb else None,
+        cache=cache,
+        results=ResultCache(result_cache_mb * 1024 * 1024) if result_cache_mb > 0 else None,
+        history_versions=history_versions,
+        history_max_mb=history_max_mb,
+    )
+    server = create_server(script_runner)
+
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            logger.debug("Server running with stdio transport")
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="data-exploration-server",
+                    server_version="0.1.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
+                ),
+            )
+    finally:
+        script_runner.shutdown()
+
+
+def create_server(script_runner: ScriptRunner) -> Server:
+    """the MCP server exposing script_runner's tools, prompts and notes
+
+    The SDK handles each request in its own task, so handlers run concurrently on the event
+    loop: a script running on the worker pool does not hold up other requests.
+    """
     server = Server("local-mini-ds")
 
+    def progress_reporter() -> Optional[ProgressCallback]:
+        """send progress notifications for the current request, if the client asked for them
+
+        The returned callback may be called from any thread.
+        """
+        context = server.request_context
+        token = context.meta.progressToken if context.meta else None
+        if token is None:
+            return None
+        loop = asyncio.get_running_loop()
+
+        def report(progress: float, total: Optional[float] = None, message: Optional[str] = None):
+            asyncio.run_coroutine_threadsafe(
+                context.session.send_progress_notification(token, progress, total, message), loop
+            )
+
+        return report
+
     @server.list_resources()
     async def handle_list_resources() -> list[Resource]:
         logger.debug("Handling list_resources request")
@@ -287,6 +3112,41 @@ async def handle_list_tools() -> list[Tool]:
                 description = LOAD_CSV_TOOL_DESCRIPTION,
                 inputSchema = LoadCsv.model_json_schema(),
             ),
+            Tool(
+                name=DataExplorationTools.LOAD_PARQUET,
+                description=LOAD_PARQUET_TOOL_DESCRIPTION,
+                inputSchema=LoadParquet.model_json_schema(),
+            ),
+            Tool(
+                name=DataExplorationTools.LOAD_FEATHER,
+                description=LOAD_FEATHER_TOOL_DESCRIPTION,
+                inputSchema=LoadFeather.model_json_schema(),
+            ),
+            Tool(
+                name=DataExplorationTools.LOAD_JSON,
+                description=LOAD_JSON_TOOL_DESCRIPTION,
+                inputSchema=LoadJson.model_json_schema(),
+            ),
+            Tool(
+                name=DataExplorationTools.LOAD_EXCEL,
+                description=LOAD_EXCEL_TOOL_DESCRIPTION,
+                inputSchema=LoadExcel.model_json_schema(),
+            ),
+            Tool(
+                name=DataExplorationTools.REFRESH_CSV,
+                description=REFRESH_CSV_TOOL_DESCRIPTION,
+                inputSchema=RefreshCsv.model_json_schema(),
+            ),
+            Tool(
+                name=DataExplorationTools.DIFF_DATAFRAME,
+                description=DIFF_DATAFRAME_TOOL_DESCRIPTION,
+                inputSchema=DiffDataframe.model_json_schema(),
+            ),
+            Tool(
+                name=DataExplorationTools.ROLLBACK_DATAFRAME,
+                description=ROLLBACK_DATAFRAME_TOOL_DESCRIPTION,
+                inputSchema=RollbackDataframe.model_json_schema(),
+            ),
             Tool(
                 name=DataExplorationTools.RUN_SCRIPT,
                 description=RUN_SCRIPT_TOOL_DESCRIPTION,
@@ -300,28 +3160,35 @@ async def handle_call_tool(
     ) -> list[TextContent | EmbeddedResource]:
         logger.debug(f"Handling call_tool request for {name} with args {arguments}")
         if name == DataExplorationTools.LOAD_CSV:
-            csv_path = arguments.get("csv_path")
-            df_name = arguments.get("df_name")
-            return script_runner.load_csv(csv_path, df_name)
+            # parsed off the event loop, so other requests and progress notifications go out meanwhile
+            return await script_runner.load_csv_async(
+                **LoadCsv(**arguments).model_dump(), progress=progress_reporter()
+            )
+        elif name == DataExplorationTools.LOAD_PARQUET:
+            return await script_runner.load_parquet_async(**LoadParquet(**arguments).model_dump())
+        elif name == DataExplorationTools.LOAD_FEATHER:
+            return await script_runner.load_feather_async(**LoadFeather(**arguments).model_dump())
+        elif name == DataExplorationTools.LOAD_JSON:
+            return await script_runner.load_json_async(**LoadJson(**arguments).model_dump())
+        elif name == DataExplorationTools.LOAD_EXCEL:
+            return await script_runner.load_excel_async(**LoadExcel(**arguments).model_dump())
+        elif name == DataExplorationTools.REFRESH_CSV:
+            return await script_runner.refresh_csv_async(**RefreshCsv(**arguments).model_dump())
+        elif name == DataExplorationTools.DIFF_DATAFRAME:
+            return script_runner.diff_dataframe(**DiffDataframe(**arguments).model_dump())
+        elif name == DataExplorationTools.ROLLBACK_DATAFRAME:
+            return script_runner.rollback_dataframe(**RollbackDataframe(**arguments).model_dump())
         elif name == DataExplorationTools.RUN_SCRIPT:
             script = arguments.get("script")
-            df_name = arguments.get("df_name")
-            return script_runner.safe_eval(script, df_name)
+            save_to_memory = arguments.get("save_to_memory")
+            timeout = arguments.get("timeout")
+            use_samples = arguments.get("use_samples", False)
+            memoize = arguments.get("memoize", False)
+            return await script_runner.safe_eval_async(
+                script, save_to_memory, timeout, progress_reporter(), use_samples, memoize
+            )
         else:
-            raise McpError(INTERNAL_ERROR, f"Unknown tool: {name}")
+            raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Unknown tool: {name}"))
         return None
 
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        logger.debug("Server running with stdio transport")
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="data-exploration-server",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
-                ),
-            ),
-        )
+    return server
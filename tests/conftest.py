@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+
+from mcp_server_ds.server import ScriptRunner
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "students.csv"
+    pd.DataFrame({
+        "id": range(1, 101),
+        "age": [18 + i % 10 for i in range(100)],
+        "score": [round(50 + i * 0.5, 1) for i in range(100)],
+        "department": ["CS", "Math", "Physics", "Biology"] * 25,
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def runner():
+    script_runner = ScriptRunner()
+    yield script_runner
+    script_runner.shutdown()
@@ -0,0 +1,20 @@
+import pytest
+
+from mcp_server_ds.server import BackgroundDataset, McpError
+
+
+def test_failed_background_load_only_fails_scripts_using_it(runner, tmp_path):
+    path = tmp_path / "broken.csv"
+    # the sample stops before the malformed row, the full load does not
+    path.write_text("a,b\n" + "".join(f"{i},{i}\n" for i in range(100)) + "1,2,3\n")
+    runner.load_csv(str(path), "bg", sample=5, background=True)
+    handle = runner.data["bg"]
+    assert isinstance(handle, BackgroundDataset)
+    handle._done.wait()
+    assert handle.failed
+
+    assert "print out result: 1" in runner.safe_eval("print(1)")[0].text
+    assert "print out result: 1" in runner.safe_eval("print(1)", use_samples=True)[0].text
+    with pytest.raises(McpError, match="Error loading dataframe 'bg'"):
+        runner.safe_eval("print(len(bg))")
+    assert runner.data["bg"] is handle
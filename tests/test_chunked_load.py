@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from mcp_server_ds.server import _read_csv_chunked
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    def write(text):
+        path = tmp_path / "data.csv"
+        path.write_text(text)
+        return str(path)
+    return write
+
+
+def assert_same_values(chunked, eager):
+    assert list(chunked.columns) == list(eager.columns)
+    for name in eager.columns:
+        assert chunked[name].astype(object).where(chunked[name].notna(), None).tolist() == \
+            eager[name].astype(object).where(eager[name].notna(), None).tolist(), name
+
+
+def test_later_chunk_overflowing_the_first_chunks_dtype(write_csv):
+    path = write_csv("small,ratio\n1,0.5\n2,0.25\n40000,0.1\n5000000000,0.123456789\n")
+    chunked = _read_csv_chunked(path, 2)
+
+    assert_same_values(chunked, pd.read_csv(path))
+    assert chunked["small"].dtype == "int64"
+    assert chunked["ratio"].dtype == "float64"
+
+
+def test_integers_widen_to_floats_for_missing_and_fractional_values(write_csv):
+    path = write_csv("n\n1\n2\n\n3.5\n")
+
+    assert_same_values(_read_csv_chunked(path, 2), pd.read_csv(path))
+
+
+def test_null_chunk_then_text(write_csv):
+    path = write_csv("id,note\n1,\n2,\n3,hello\n4,world\n")
+    chunked = _read_csv_chunked(path, 2)
+
+    assert_same_values(chunked, pd.read_csv(path))
+    assert chunked["note"].tolist()[2:] == ["hello", "world"]
+
+
+def test_numbers_then_text(write_csv):
+    path = write_csv("code\n1\n2\nA3\n4\n")
+
+    assert_same_values(_read_csv_chunked(path, 2), pd.read_csv(path, dtype={"code": str}))
+
+
+def test_chunked_load_matches_eager_load(runner, csv_path):
+    runner.load_csv(csv_path, "eager", use_cache=False)
+    runner.load_csv(csv_path, "chunked", chunksize=7, use_cache=False)
+
+    assert_same_values(runner.data["chunked"], runner.data["eager"])
@@ -0,0 +1,46 @@
+import pytest
+
+from mcp_server_ds import server
+from mcp_server_ds.server import CompiledScript, McpError, _compile_script
+
+
+def test_repeated_script_is_compiled_once(runner, csv_path, monkeypatch):
+    runner.load_csv(csv_path, "s")
+    script = "print(s['age'].sum() + 0)  # compiled once"
+    _compile_script.cache_clear()
+    compiles = []
+    monkeypatch.setattr(server, "compile", lambda *args: compiles.append(args) or compile(*args), raising=False)
+
+    first = runner.safe_eval(script)[0].text
+    second = runner.safe_eval(script)[0].text
+
+    assert first == second
+    assert len(compiles) == 1
+    assert _compile_script.cache_info().hits >= 1
+
+
+def test_metadata_lists_names_imports_and_inputs():
+    compiled = CompiledScript("import numpy.linalg as la\nfrom scipy import stats\nt = s.head()\nprint(t, u)")
+
+    assert compiled.error is None
+    assert compiled.names == {"t", "s", "print", "u"}
+    assert compiled.imports == {"numpy", "scipy"}
+    assert compiled.inputs == {"s", "print", "u"}
+
+
+def test_dynamic_lookups_disable_name_metadata():
+    compiled = CompiledScript("print(globals()['s'])")
+
+    assert compiled.names is None and compiled.inputs is None
+
+
+def test_syntax_error_is_cached_and_raised_when_run(runner):
+    script = "print(1"
+    _compile_script.cache_clear()
+
+    for _ in range(2):
+        with pytest.raises(McpError, match="was never closed|unexpected EOF"):
+            runner.safe_eval(script)
+
+    assert isinstance(_compile_script(script).error, SyntaxError)
+    assert _compile_script.cache_info().misses == 1
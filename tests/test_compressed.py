@@ -0,0 +1,72 @@
+import bz2
+import gzip
+import lzma
+import zipfile
+
+import pandas as pd
+import pytest
+import zstandard
+
+from mcp_server_ds.server import McpError
+
+COMPRESSORS = {
+    ".csv.gz": gzip.compress,
+    ".csv.bz2": bz2.compress,
+    ".csv.xz": lzma.compress,
+    ".csv.zst": lambda data: zstandard.ZstdCompressor().compress(data),
+}
+
+
+@pytest.fixture
+def plain(csv_path):
+    return pd.read_csv(csv_path)
+
+
+@pytest.mark.parametrize("suffix", COMPRESSORS)
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+def test_compressed_csv_loads_like_the_plain_file(runner, csv_path, tmp_path, plain, suffix, engine):
+    with open(csv_path, "rb") as f:
+        data = f.read()
+    path = tmp_path / f"students{suffix}"
+    path.write_bytes(COMPRESSORS[suffix](data))
+
+    runner.load_csv(str(path), "s", engine=engine)
+
+    df = runner.data["s"]
+    assert df.astype(plain.dtypes.to_dict()).equals(plain)
+
+
+def test_compressed_csv_with_chunks_and_filter(runner, csv_path, tmp_path, plain):
+    path = tmp_path / "students.csv.gz"
+    with open(csv_path, "rb") as f:
+        path.write_bytes(gzip.compress(f.read()))
+
+    runner.load_csv(str(path), "s", chunksize=7, row_filter="department == 'CS'")
+
+    expected = plain[plain["department"] == "CS"].reset_index(drop=True)
+    assert runner.data["s"].astype(expected.dtypes.to_dict()).equals(expected)
+
+
+def test_zip_archive_loads_its_csv_members(runner, csv_path, tmp_path, plain):
+    path = tmp_path / "exports.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.write(csv_path, "2024/b.csv")
+        archive.write(csv_path, "2024/a.csv")
+        archive.writestr("readme.txt", "not a csv")
+
+    runner.load_csv(str(path), "both", source_column="source")
+    runner.load_csv(f"{path}/2024/a.csv", "member")
+
+    both = runner.data["both"]
+    assert len(both) == 200
+    assert both["source"].cat.categories.tolist() == [f"{path}/2024/a.csv", f"{path}/2024/b.csv"]
+    assert runner.data["member"].equals(plain)
+
+
+def test_missing_zip_member_is_an_error(runner, csv_path, tmp_path):
+    path = tmp_path / "exports.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.write(csv_path, "a.csv")
+
+    with pytest.raises(McpError):
+        runner.load_csv(f"{path}/missing.csv", "s")
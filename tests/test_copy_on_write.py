@@ -0,0 +1,56 @@
+import pytest
+
+from mcp_server_ds.server import ScriptRunner
+
+pytestmark = pytest.mark.anyio
+
+IN_PLACE_EDITS = """
+s.loc[0, 'age'] = -1
+s['score'] *= 2
+s.drop(columns=['department'], inplace=True)
+s['extra'] = 1
+print(s.shape)
+"""
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+async def test_in_place_edits_do_not_reach_stored_dataframes(executor, csv_path):
+    runner = ScriptRunner(executor=executor)
+    runner.load_csv(csv_path, "s")
+    runner.load_csv(csv_path, "twin")
+    before = runner.data["s"].copy()
+    version = runner.data.versions["s"]
+    try:
+        result = await runner.safe_eval_async(IN_PLACE_EDITS)
+    finally:
+        runner.shutdown()
+
+    assert "(100, 4)" in result[0].text
+    assert runner.data["s"].equals(before)
+    assert runner.data["twin"].equals(before)
+    assert runner.data.versions["s"] == version
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+async def test_saved_edits_replace_only_the_saved_name(executor, csv_path):
+    runner = ScriptRunner(executor=executor)
+    runner.load_csv(csv_path, "s")
+    runner.load_csv(csv_path, "twin")
+    before = runner.data["twin"].copy()
+    try:
+        await runner.safe_eval_async(IN_PLACE_EDITS, save_to_memory=["s"])
+    finally:
+        runner.shutdown()
+
+    assert runner.data["s"]["age"].iloc[0] == -1
+    assert "department" not in runner.data["s"].columns
+    assert runner.data["twin"].equals(before)
+
+
+def test_synchronous_run_does_not_leak_edits(runner, csv_path):
+    runner.load_csv(csv_path, "s")
+    before = runner.data["s"].copy()
+
+    runner.safe_eval(IN_PLACE_EDITS)
+
+    assert runner.data["s"].equals(before)
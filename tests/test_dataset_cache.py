@@ -0,0 +1,55 @@
+import os
+import shutil
+import time
+
+import pytest
+
+from mcp_server_ds.server import DatasetCache, ScriptRunner
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "cache")
+
+
+def test_repeated_load_hits_the_cache(csv_path, cache_dir):
+    runner = ScriptRunner(cache=DatasetCache(cache_dir, 10 * 1024 * 1024))
+    runner.load_csv(csv_path, "a")
+    result = runner.load_csv(csv_path, "b", use_cache=True)
+
+    assert len(os.listdir(cache_dir)) == 1
+    assert runner.data["a"].equals(runner.data["b"])
+    assert "Successfully loaded" in result[0].text
+
+
+def test_failing_cache_writes_do_not_fail_the_load(csv_path, cache_dir):
+    runner = ScriptRunner(cache=DatasetCache(cache_dir, 10 * 1024 * 1024))
+    # the cache directory is replaced by a file, so every write fails
+    shutil.rmtree(cache_dir)
+    with open(cache_dir, "w") as f:
+        f.write("not a directory")
+
+    result = runner.load_csv(csv_path, "a")
+
+    assert "Successfully loaded" in result[0].text
+    assert len(runner.data["a"]) == 100
+
+
+def test_unusable_directory_raises_os_error(tmp_path):
+    path = tmp_path / "file"
+    path.write_text("")
+    with pytest.raises(OSError):
+        DatasetCache(str(path / "cache"), 1024)
+
+
+def test_stale_temporary_files_are_removed(cache_dir):
+    os.makedirs(cache_dir)
+    stale, fresh = os.path.join(cache_dir, "a.arrow.1.tmp"), os.path.join(cache_dir, "b.arrow.2.tmp")
+    for path in (stale, fresh):
+        open(path, "w").close()
+    old = time.time() - 2 * DatasetCache.STALE_TEMP_SECONDS
+    os.utime(stale, (old, old))
+
+    DatasetCache(cache_dir, 1024)
+
+    assert not os.path.exists(stale) and os.path.exists(fresh)
@@ -0,0 +1,61 @@
+import pandas as pd
+
+from mcp_server_ds.server import _datetime_format, _parse_datetime_columns
+
+
+def test_formats_are_guessed_from_the_first_value():
+    assert _datetime_format(pd.Series(["2024-06-01", "2024-12-31"])) == "%Y-%m-%d"
+    assert _datetime_format(pd.Series(["2024-06-01 08:30:00"])) == "%Y-%m-%d %H:%M:%S"
+    # 13/06 only parses day first
+    assert _datetime_format(pd.Series(["01/06/2024", "13/06/2024"])) == "%d/%m/%Y"
+
+
+def test_codes_and_partial_dates_are_not_formats():
+    assert _datetime_format(pd.Series(["2024", "2025"])) is None
+    assert _datetime_format(pd.Series(["08:30", "09:15"])) is None
+    assert _datetime_format(pd.Series(["A-1", "B-2"])) is None
+    assert _datetime_format(pd.Series([20240601])) is None
+
+
+def test_date_columns_are_converted():
+    df = pd.DataFrame({
+        "day": ["2024-06-01", "2024-06-02", None],
+        "stamp": ["2024-06-01 08:30:00", "2024-06-01 09:00:00", "2024-06-02 10:15:00"],
+        "name": ["x", "y", "z"],
+        "n": [1, 2, 3],
+    })
+    parsed, names = _parse_datetime_columns(df)
+
+    assert names == ["day", "stamp"]
+    assert parsed["day"].dtype.kind == "M" and parsed["day"].isna().tolist() == [False, False, True]
+    assert parsed["stamp"].iloc[2] == pd.Timestamp("2024-06-02 10:15:00")
+    assert parsed["name"].tolist() == ["x", "y", "z"] and parsed["n"].dtype == "int64"
+
+
+def test_columns_with_a_value_that_is_not_a_date_stay_text():
+    df = pd.DataFrame({"when": ["2024-06-01", "2024-06-02", "soon"]})
+    parsed, names = _parse_datetime_columns(df)
+
+    assert names == []
+    assert parsed["when"].tolist() == ["2024-06-01", "2024-06-02", "soon"]
+
+
+def test_categorical_columns_parse_their_categories():
+    col = pd.Categorical(["2024-06-01", "2024-06-02", None, "2024-06-01"])
+    parsed, names = _parse_datetime_columns(pd.DataFrame({"day": col}))
+
+    assert names == ["day"]
+    assert parsed["day"].tolist()[:2] == [pd.Timestamp("2024-06-01"), pd.Timestamp("2024-06-02")]
+    assert parsed["day"].isna().tolist() == [False, False, True, False]
+    assert parsed["day"].iloc[3] == pd.Timestamp("2024-06-01")
+
+
+def test_load_csv_detects_dates_unless_disabled(runner, tmp_path):
+    path = tmp_path / "events.csv"
+    path.write_text("id,day,label\n1,2024-06-01,a\n2,2024-06-03,b\n")
+    result = runner.load_csv(str(path), "detected")
+    runner.load_csv(str(path), "text", detect_dates=False)
+
+    assert "Date/time columns: day" in result[0].text
+    assert runner.data["detected"]["day"].dtype.kind == "M"
+    assert runner.data["text"]["day"].tolist() == ["2024-06-01", "2024-06-03"]
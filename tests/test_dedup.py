@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+
+
+def _shares_buffers(a, b):
+    return all(np.shares_memory(a[name].to_numpy(), b[name].to_numpy()) for name in ("id", "age", "score"))
+
+
+def test_repeated_load_shares_column_buffers(runner, csv_path):
+    runner.load_csv(csv_path, "a")
+    result = runner.load_csv(csv_path)
+
+    assert "dataframe 'df_2' (shares data with 'a'" in result[0].text
+    b = runner.data["df_2"]
+    assert b is not runner.data["a"]
+    assert b.equals(runner.data["a"])
+    assert _shares_buffers(runner.data["a"], b)
+
+
+def test_edits_to_a_shared_load_stay_in_their_name(runner, csv_path):
+    runner.load_csv(csv_path, "a")
+    runner.load_csv(csv_path, "b")
+
+    runner.safe_eval("b.loc[0, 'age'] = 99\nb['age'] += 1", save_to_memory=["b"])
+
+    assert runner.data["a"]["age"].iloc[0] == 18
+    assert runner.data["b"]["age"].iloc[0] == 100
+
+
+def test_different_options_are_loaded_separately(runner, csv_path):
+    runner.load_csv(csv_path, "a")
+    result = runner.load_csv(csv_path, "b", optimize=True)
+
+    assert "shares data" not in result[0].text
+    assert runner.data["b"]["id"].dtype == "int8"
+
+
+def test_changed_file_is_parsed_again(runner, csv_path):
+    runner.load_csv(csv_path, "a")
+    with open(csv_path, "a") as f:
+        f.write("101,20,99.0,CS\n")
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    result = runner.load_csv(csv_path, "b")
+
+    assert "shares data" not in result[0].text
+    assert len(runner.data["b"]) == 101 and len(runner.data["a"]) == 100
+
+
+def test_replaced_original_is_not_shared(runner, csv_path):
+    runner.load_csv(csv_path, "a")
+    runner.safe_eval("a = a.head(3)", save_to_memory=["a"])
+
+    result = runner.load_csv(csv_path, "b")
+
+    assert "shares data" not in result[0].text
+    assert len(runner.data["b"]) == 100
@@ -0,0 +1,78 @@
+import anyio
+import pytest
+from mcp.shared.exceptions import McpError
+
+from mcp_server_ds.server import ScriptRunner
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(params=["thread", "process"])
+def executor(request):
+    return request.param
+
+
+async def test_timed_out_script_leaves_data_unchanged(executor, csv_path, tmp_path):
+    runner = ScriptRunner(executor=executor)
+    runner.load_csv(csv_path, "s")
+    before = runner.data["s"]
+    version = runner.data.versions["s"]
+    marker = tmp_path / "finished"
+    script = f"import time\ns = s.head(1)\nfor _ in range(40): time.sleep(0.05)\nopen({str(marker)!r}, 'w').close()"
+    try:
+        with pytest.raises(McpError, match="timed out"):
+            await runner.safe_eval_async(script, save_to_memory=["s"], timeout=0.5)
+        await anyio.sleep(2.5)
+        result = await runner.safe_eval_async("print(len(s))")
+    finally:
+        runner.shutdown()
+
+    assert not marker.exists()
+    assert runner.data["s"] is before
+    assert runner.data.versions["s"] == version
+    assert "100" in result[0].text
+
+
+async def test_worker_ignoring_the_abort_is_replaced(csv_path):
+    runner = ScriptRunner(executor="process")
+    runner.ABORT_GRACE_PERIOD = 0.5
+    runner.load_csv(csv_path, "s")
+    before = runner.data["s"]
+    script = "import signal, time\nsignal.signal(signal.SIGUSR1, signal.SIG_IGN)\ns = s.head(1)\ntime.sleep(30)"
+    try:
+        with pytest.raises(McpError, match="timed out"):
+            await runner.safe_eval_async(script, save_to_memory=["s"], timeout=0.5)
+        await anyio.sleep(2)
+        # the stuck worker was killed and its pool shut down
+        assert runner._executor is None
+        result = await runner.safe_eval_async("print(len(s))")
+    finally:
+        runner.shutdown()
+
+    assert runner.data["s"] is before
+    assert "100" in result[0].text
+
+
+
+async def test_killing_a_runaway_worker_spares_other_scripts(csv_path):
+    runner = ScriptRunner(executor="process", max_workers=2)
+    runner.ABORT_GRACE_PERIOD = 0.5
+    runner.load_csv(csv_path, "s")
+    results = {}
+
+    async def runaway():
+        # one C call, so the worker cannot run its abort signal handler and is killed
+        with pytest.raises(McpError, match="timed out"):
+            await runner.safe_eval_async("sum(range(10**12))", timeout=0.5)
+
+    async def innocent():
+        results["innocent"] = await runner.safe_eval_async("import time\ntime.sleep(3)\nprint(len(s))")
+
+    try:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(runaway)
+            tg.start_soon(innocent)
+    finally:
+        runner.shutdown()
+
+    assert "100" in results["innocent"][0].text
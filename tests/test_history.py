@@ -0,0 +1,40 @@
+import pandas as pd
+
+from mcp_server_ds.server import VersionedData
+
+
+def frame(rows=10_000):
+    return pd.DataFrame({"a": range(rows), "b": [0.5] * rows, "c": [1] * rows})
+
+
+def test_version_is_charged_for_changed_columns_only():
+    data = VersionedData(x=frame())
+    original = data["x"]
+    data["x"] = original.assign(a=original["a"] + 1)
+
+    # a RangeIndex is charged its few bytes, as it has no buffer to share
+    assert data.history_bytes == original["a"].memory_usage(index=True, deep=True)
+
+
+def test_full_copies_are_dropped_beyond_the_memory_budget():
+    size = frame().memory_usage(index=True, deep=True).sum()
+    data = VersionedData(x=frame(), max_history_bytes=int(size * 2.5))
+    for _ in range(4):
+        # a reload shares nothing with the frame it replaces
+        data["x"] = frame()
+
+    assert len(data.history["x"]) == 2
+    assert data.history_bytes <= data.max_history_bytes
+    assert data.previous_version("x") == data.versions["x"] - 1
+
+
+def test_rollback_keeps_the_budget_accounting():
+    data = VersionedData(x=frame())
+    first = data.versions["x"]
+    data["x"] = frame()
+    data.rollback("x", first)
+
+    assert list(data.history["x"]) == [first + 1]
+    assert data.history_bytes > 0
+    data.clear()
+    assert data.history_bytes == 0
@@ -0,0 +1,45 @@
+import re
+
+import pandas as pd
+
+from mcp_server_ds.server import REPORT_MAX_COLUMNS, _ingestion_report
+
+
+def test_report_describes_speed_memory_and_suggestions(runner, csv_path):
+    result = runner.load_csv(csv_path, "s", report=True)
+
+    text = result[0].text
+    assert "Ingestion report:" in text
+    assert re.search(r"parse time: [\d.]+s, [\d,]+ rows/s, [\d.]+ \w?B/s \([\d.]+ \w?B input\)", text)
+    assert "memory: " in text and "for 100 rows x 4 columns" in text
+    for line in ("id: int64", "score: float64", "department: object"):
+        assert f"    {line}, " in text
+    assert "optimize=true stores 4 columns in smaller dtypes (id, age, score, department)" in text
+
+
+def test_report_is_only_added_when_asked_for(runner, csv_path):
+    assert "Ingestion report" not in runner.load_csv(csv_path, "s")[0].text
+
+
+def test_report_drops_suggestions_already_applied(runner, csv_path):
+    text = runner.load_csv(csv_path, "s", report=True, optimize=True, engine="pyarrow")[0].text
+
+    assert "suggestions: none" in text
+
+
+def test_report_suggests_arrow_strings_and_column_selection():
+    wide = pd.DataFrame({f"text_{i}": [f"value {j}" for j in range(50)] for i in range(REPORT_MAX_COLUMNS + 1)})
+
+    text = _ingestion_report(wide, 10_000, 0.5, None, "c", None, True, None)
+
+    assert 'engine="pyarrow" keeps text columns as Arrow strings' in text
+    assert "columns=[...] loads only the columns you need" in text
+    assert "peak RSS" not in text
+
+
+def test_report_for_a_shared_load_has_no_parse_timing(runner, csv_path):
+    runner.load_csv(csv_path, "a")
+    text = runner.load_csv(csv_path, "b", report=True)[0].text
+
+    assert "shares data with 'a'" in text and "Ingestion report:" in text
+    assert "parse time" not in text
@@ -0,0 +1,63 @@
+import pytest
+
+from mcp_server_ds.server import LazyDataset, McpError, ScriptRunner
+
+pytestmark = pytest.mark.anyio
+
+
+def test_lazy_load_records_schema_without_parsing(runner, csv_path):
+    result = runner.load_csv(csv_path, "s", lazy=True)
+
+    handle = runner.data["s"]
+    assert isinstance(handle, LazyDataset)
+    assert list(handle.dtypes.index) == ["id", "age", "score", "department"]
+    assert 50 <= handle.row_estimate <= 200
+    assert "lazy dataframe 's'" in result[0].text and "department: object" in result[0].text
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+async def test_lazy_dataset_is_parsed_only_by_scripts_using_it(executor, csv_path):
+    runner = ScriptRunner(executor=executor)
+    runner.load_csv(csv_path, "s", lazy=True)
+    handle = runner.data["s"]
+    parses = []
+    loader = handle._loader
+    handle._loader = lambda: parses.append(1) or loader()
+    try:
+        await runner.safe_eval_async("print(1 + 1)")
+        assert runner.data["s"] is handle and not parses
+
+        result = await runner.safe_eval_async("print(len(s))")
+        await runner.safe_eval_async("print(s['age'].max())")
+    finally:
+        runner.shutdown()
+
+    assert "print out result: 100" in result[0].text
+    assert parses == [1]
+    assert len(runner.data["s"]) == 100
+    assert "Loaded lazy dataframe 's'" in runner.notes
+
+
+def test_lazy_load_keeps_columns_and_row_filter(runner, csv_path):
+    runner.load_csv(csv_path, "s", lazy=True, columns=["id", "age"], row_filter="age == 18")
+    assert list(runner.data["s"].dtypes.index) == ["id", "age"]
+
+    runner.safe_eval("print(s)")
+
+    assert list(runner.data["s"].columns) == ["id", "age"]
+    assert runner.data["s"]["age"].eq(18).all() and len(runner.data["s"]) == 10
+
+
+def test_lazy_load_error_surfaces_when_used(runner, tmp_path):
+    path = tmp_path / "broken.csv"
+    path.write_text("a,b\n1,2\n")
+    runner.load_csv(str(path), "s", lazy=True, row_filter="missing > 1")
+
+    with pytest.raises(McpError, match="Error loading dataframe 's'"):
+        runner.safe_eval("print(s)")
+    assert isinstance(runner.data["s"], LazyDataset)
+
+
+def test_lazy_cannot_be_combined_with_sample(runner, csv_path):
+    with pytest.raises(McpError, match="lazy cannot be combined"):
+        runner.load_csv(csv_path, "s", lazy=True, sample=10)
@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+
+from mcp_server_ds import server
+
+
+@pytest.mark.anyio
+async def test_csv_is_parsed_off_the_event_loop_and_stored_on_it(runner, csv_path, monkeypatch):
+    threads = {}
+    read_csv, setitem = server._read_csv, server.VersionedData.__setitem__
+
+    def recording_read_csv(*args, **kwargs):
+        threads["parse"] = threading.current_thread()
+        return read_csv(*args, **kwargs)
+
+    def recording_setitem(data, key, value):
+        threads["store"] = threading.current_thread()
+        setitem(data, key, value)
+
+    monkeypatch.setattr(server, "_read_csv", recording_read_csv)
+    monkeypatch.setattr(server.VersionedData, "__setitem__", recording_setitem)
+    await runner.load_csv_async(csv_path, "s", use_cache=False)
+
+    assert threads["parse"] is not threading.main_thread()
+    assert threads["store"] is threading.main_thread()
+    assert len(runner.data["s"]) == 100 and "s" in runner.tails
+
+
+def test_failed_load_leaves_no_tail(runner, tmp_path):
+    path = tmp_path / "broken.csv"
+    path.write_text("a,b\n1,2\n")
+    runner.load_csv(str(path), "s")
+    tail = runner.tails["s"]
+
+    with pytest.raises(server.McpError):
+        runner.load_csv(str(path), "s", row_filter="missing > 1")
+
+    assert runner.tails["s"] is tail
+    assert runner.data["s"]["a"].tolist() == [1]
@@ -0,0 +1,42 @@
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from mcp_server_ds.server import DatasetCache, ScriptRunner
+
+
+def test_sheet_with_mixed_type_column_is_cached(tmp_path):
+    excel_path = str(tmp_path / "codes.xlsx")
+    pd.DataFrame({"code": [1, "A2", 3, None], "count": [4, 5, 6, 7]}).to_excel(excel_path, index=False)
+    cache_dir = str(tmp_path / "cache")
+    runner = ScriptRunner(cache=DatasetCache(cache_dir, 10 * 1024 * 1024))
+
+    first = runner.load_excel(excel_path, df_name="a")
+    second = runner.load_excel(excel_path, df_name="b")
+
+    assert len(os.listdir(cache_dir)) == 1
+    assert "stored as text: code" in first[0].text
+    assert "(from cache)" in second[0].text
+    assert runner.data["a"].equals(runner.data["b"])
+    assert runner.data["a"]["code"].tolist()[:3] == ["1", "A2", "3"]
+    assert runner.data["a"]["code"].isna().tolist()[3]
+
+
+@pytest.mark.anyio
+async def test_workbook_is_read_off_the_event_loop(runner, tmp_path, monkeypatch):
+    excel_path = str(tmp_path / "book.xlsx")
+    pd.DataFrame({"a": [1, 2]}).to_excel(excel_path, index=False)
+    threads = {}
+    read_excel = pd.read_excel
+
+    def recording_read_excel(*args, **kwargs):
+        threads["parse"] = threading.current_thread()
+        return read_excel(*args, **kwargs)
+
+    monkeypatch.setattr(pd, "read_excel", recording_read_excel)
+    await runner.load_excel_async(excel_path, df_name="a")
+
+    assert threads["parse"] is not threading.main_thread()
+    assert runner.data["a"]["a"].tolist() == [1, 2]
@@ -0,0 +1,60 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from mcp_server_ds import server
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+
+
+@pytest.fixture(params=["parquet", "feather", "json"])
+def file_kind(request):
+    return request.param
+
+
+def write(frame, path, kind):
+    if kind == "parquet":
+        frame.to_parquet(path)
+    elif kind == "feather":
+        frame.to_feather(path)
+    else:
+        frame.to_json(path, orient="records", lines=True)
+
+
+async def test_files_are_read_off_the_event_loop(runner, frame, file_kind, tmp_path, monkeypatch):
+    path = str(tmp_path / f"data.{file_kind}")
+    write(frame, path, file_kind)
+    owner, attribute = {
+        "parquet": (server, "_read_parquet"),
+        "feather": (server.pyarrow.feather, "read_table"),
+        "json": (server.pd, "read_json"),
+    }[file_kind]
+    reader = getattr(owner, attribute)
+    threads = {}
+
+    def recording_reader(*args, **kwargs):
+        threads["parse"] = threading.current_thread()
+        return reader(*args, **kwargs)
+
+    monkeypatch.setattr(owner, attribute, recording_reader)
+    await getattr(runner, f"load_{file_kind}_async")(path, "d")
+
+    assert threads["parse"] is not threading.main_thread()
+    assert runner.data["d"].equals(frame)
+
+
+async def test_repeated_load_shares_data(runner, frame, file_kind, tmp_path):
+    path = str(tmp_path / f"data.{file_kind}")
+    write(frame, path, file_kind)
+    load = getattr(runner, f"load_{file_kind}_async")
+    await load(path, "d")
+    result = await load(path, "e")
+
+    assert "shares data with 'd'" in result[0].text
+    assert runner.data["e"].equals(frame)
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from mcp_server_ds.server import ResultCache, ScriptRunner, _compile_script
+
+
+def test_memoized_result_misses_after_an_input_changes(csv_path):
+    runner = ScriptRunner(results=ResultCache(10 * 1024 * 1024))
+    runner.load_csv(csv_path, "s")
+    runner.load_csv(csv_path, "other")
+    script = "print(s['age'].sum())"
+
+    runner.safe_eval(script, memoize=True)
+    hit = runner.safe_eval(script, memoize=True)
+    runner.data["other"] = runner.data["other"].head(1)
+    unrelated = runner.safe_eval(script, memoize=True)
+    runner.data["s"] = runner.data["s"].head(1)
+    miss = runner.safe_eval(script, memoize=True)
+
+    assert "memoized result" in hit[0].text
+    assert "memoized result" in unrelated[0].text
+    assert "memoized result" not in miss[0].text
+    assert "18" in miss[0].text
+
+
+def test_augmented_assignment_reads_its_target():
+    runner = ScriptRunner(results=ResultCache(10 * 1024 * 1024))
+    runner.data["t"] = pd.DataFrame({"a": [1, 2]})
+    runner.safe_eval("t += 1", save_to_memory=["t"], memoize=True)
+    runner.data["t"] = pd.DataFrame({"a": [10, 20]})
+
+    result = runner.safe_eval("t += 1", save_to_memory=["t"], memoize=True)
+
+    assert "memoized result" not in result[0].text
+    assert runner.data["t"]["a"].tolist() == [11, 21]
+
+
+def test_inputs_of_augmented_and_plain_assignments():
+    assert _compile_script("t += 1").inputs == {"t"}
+    assert _compile_script("t = s\nt += 1").inputs == {"s"}
+    assert _compile_script("x: int\nprint(x)").inputs == {"int", "x", "print"}
@@ -0,0 +1,66 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from mcp_server_ds import server
+from mcp_server_ds.server import DatasetCache, McpError, ScriptRunner
+
+
+@pytest.fixture
+def shards(tmp_path):
+    directory = tmp_path / "shards"
+    directory.mkdir()
+    for day in range(1, 4):
+        pd.DataFrame({"day": [day] * 3, "value": [day * 10 + i for i in range(3)]}).to_csv(
+            directory / f"2024-06-0{day}.csv", index=False)
+    (directory / "notes.txt").write_text("not a shard")
+    return directory
+
+
+def test_directory_loads_every_csv_in_name_order(runner, shards):
+    result = runner.load_csv(str(shards), "s")
+
+    df = runner.data["s"]
+    assert df["day"].tolist() == [1, 1, 1, 2, 2, 2, 3, 3, 3]
+    assert df.index.tolist() == list(range(9))
+    assert "from 3 files" in result[0].text
+
+
+def test_glob_selects_matching_shards_with_a_source_column(runner, shards):
+    runner.load_csv(str(shards / "2024-06-0[23].csv"), "s", source_column="source")
+
+    df = runner.data["s"]
+    assert df["day"].tolist() == [2, 2, 2, 3, 3, 3]
+    assert isinstance(df["source"].dtype, pd.CategoricalDtype)
+    assert [name.rsplit("/", 1)[-1] for name in df["source"].drop_duplicates()] == ["2024-06-02.csv", "2024-06-03.csv"]
+
+
+def test_reloading_shards_reuses_the_unchanged_ones(shards, tmp_path):
+    runner = ScriptRunner(cache=DatasetCache(str(tmp_path / "cache"), 10 * 1024 * 1024))
+    runner.load_csv(str(shards), "s")
+    pd.DataFrame({"day": [4], "value": [40]}).to_csv(shards / "2024-06-04.csv", index=False)
+
+    result = runner.load_csv(str(shards), "t")
+
+    assert runner.data["t"]["day"].tolist()[-1] == 4
+    assert "from 4 files (3 from cache)" in result[0].text
+
+
+def test_glob_without_matches_is_an_error(runner, shards):
+    with pytest.raises(McpError, match="No CSV files found"):
+        runner.load_csv(str(shards / "2023-*.csv"), "s")
+
+
+def test_shards_are_parsed_on_a_worker_pool(runner, shards, monkeypatch):
+    threads = set()
+    read_csv = server._read_csv
+
+    def recording_read_csv(*args, **kwargs):
+        threads.add(threading.current_thread().name)
+        return read_csv(*args, **kwargs)
+
+    monkeypatch.setattr(server, "_read_csv", recording_read_csv)
+    runner.load_csv(str(shards), "s", use_cache=False)
+
+    assert threads and all(name.startswith("csv-loader") for name in threads)
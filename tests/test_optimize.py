@@ -0,0 +1,38 @@
+import pandas as pd
+
+from mcp_server_ds.server import _optimize_dtypes
+
+
+def test_optimize_downcasts_numbers_and_encodes_repeated_text(runner, csv_path):
+    result = runner.load_csv(csv_path, "s", optimize=True)
+
+    df = runner.data["s"]
+    assert df["id"].dtype == "int8" and df["age"].dtype == "int8"
+    assert df["score"].dtype == "float32"
+    assert isinstance(df["department"].dtype, pd.CategoricalDtype)
+    assert "Optimized dtypes: memory usage" in result[0].text
+    assert df.astype({"department": object}).equals(
+        pd.read_csv(csv_path).astype(df.dtypes.drop("department").to_dict()))
+
+
+def test_optimize_keeps_values_that_need_a_wide_type():
+    df = pd.DataFrame({
+        "big": [0, 2**40],
+        "precise": [0.1, 1 / 3],
+        "unique_text": ["a", "b"],
+    })
+
+    optimized = _optimize_dtypes(df)
+
+    assert optimized["big"].dtype == "int64"
+    assert optimized["precise"].dtype == "float64"
+    assert optimized["unique_text"].dtype == object
+    assert optimized.equals(df)
+
+
+def test_optimize_is_off_by_default(runner, csv_path):
+    result = runner.load_csv(csv_path, "s")
+
+    assert runner.data["s"]["id"].dtype == "int64"
+    assert runner.data["s"]["department"].dtype == object
+    assert "Optimized" not in result[0].text
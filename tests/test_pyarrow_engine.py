@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from mcp_server_ds.server import McpError
+
+
+def test_pyarrow_engine_keeps_arrow_backed_columns(runner, csv_path):
+    runner.load_csv(csv_path, "s", engine="pyarrow")
+
+    df = runner.data["s"]
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+    assert str(df["department"].dtype) == "string[pyarrow]"
+    expected = pd.read_csv(csv_path)
+    assert df.astype(expected.dtypes.to_dict()).equals(expected)
+
+
+def test_pyarrow_engine_applies_columns_and_row_filter(runner, csv_path):
+    runner.load_csv(csv_path, "s", engine="pyarrow", columns=["id", "department"], row_filter="id <= 10")
+
+    df = runner.data["s"]
+    assert list(df.columns) == ["id", "department"]
+    assert df["id"].tolist() == list(range(1, 11))
+
+
+def test_pyarrow_engine_cannot_stream_chunks(runner, csv_path):
+    with pytest.raises(McpError, match="chunksize"):
+        runner.load_csv(csv_path, "s", engine="pyarrow", chunksize=10)
+
+    assert "s" not in runner.data
+
+
+def test_unknown_engine_is_rejected(runner, csv_path):
+    with pytest.raises(McpError):
+        runner.load_csv(csv_path, "s", engine="polars")
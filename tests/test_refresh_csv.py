@@ -0,0 +1,119 @@
+import threading
+
+import pytest
+
+from mcp_server_ds import server
+
+
+def append_rows(path, first_id, count):
+    with open(path, "a") as f:
+        for row_id in range(first_id, first_id + count):
+            f.write(f"{row_id},20,75.0,CS\n")
+
+
+def test_rows_appended_during_the_load_are_read_once(runner, csv_path, monkeypatch):
+    mark = server._CsvTail.mark
+
+    def mark_then_append(tail):
+        offset = mark(tail)
+        # a writer appends while the full parse runs
+        append_rows(csv_path, 101, 10)
+        return offset
+
+    monkeypatch.setattr(server._CsvTail, "mark", mark_then_append)
+    runner.load_csv(csv_path, "s")
+    monkeypatch.setattr(server._CsvTail, "mark", mark)
+    runner.refresh_csv("s")
+
+    df = runner.data["s"]
+    assert len(df) == 110
+    assert df.duplicated().sum() == 0
+
+
+def test_half_written_last_line_is_replaced_on_refresh(runner, csv_path):
+    with open(csv_path, "a") as f:
+        f.write("101,2")
+    runner.load_csv(csv_path, "s")
+    assert len(runner.data["s"]) == 101
+
+    with open(csv_path, "a") as f:
+        f.write("0,75.0,CS\n")
+    result = runner.refresh_csv("s")
+
+    df = runner.data["s"]
+    assert "Appended 0 new rows" in result[0].text
+    assert len(df) == 101
+    assert df.iloc[-1].tolist() == [101, 20, 75.0, "CS"]
+
+
+def test_last_line_without_newline_is_loaded(runner, tmp_path):
+    path = tmp_path / "no_newline.csv"
+    path.write_bytes(b"a,b\n1,2\n3,4")
+    runner.load_csv(str(path), "s")
+    assert runner.data["s"].values.tolist() == [[1, 2], [3, 4]]
+
+    with open(path, "ab") as f:
+        f.write(b"\n5,6")
+    runner.refresh_csv("s")
+    assert runner.data["s"].values.tolist() == [[1, 2], [3, 4], [5, 6]]
+
+    assert "No new rows" in runner.refresh_csv("s")[0].text
+    assert len(runner.data["s"]) == 3
+
+
+def test_refresh_appends_new_rows(runner, csv_path):
+    runner.load_csv(csv_path, "s")
+    append_rows(csv_path, 101, 5)
+    result = runner.refresh_csv("s")
+
+    assert "Appended 5 new rows" in result[0].text
+    assert runner.data["s"]["id"].tolist() == list(range(1, 106))
+
+
+def test_appended_values_are_not_squeezed_into_compact_dtypes(runner, tmp_path):
+    path = tmp_path / "small.csv"
+    path.write_text("a,b\n" + "".join(f"{i},{i / 4}\n" for i in range(10)))
+    runner.load_csv(str(path), "s", optimize=True)
+    assert str(runner.data["s"]["a"].dtype) == "int8"
+
+    with open(path, "a") as f:
+        f.write("40000,0.1\n5,0.5\n")
+    runner.refresh_csv("s")
+
+    df = runner.data["s"]
+    assert df["a"].tolist()[-2:] == [40000, 5]
+    assert df["b"].tolist()[-2:] == [0.1, 0.5]
+    assert df["a"].tolist()[:10] == list(range(10))
+
+
+@pytest.mark.anyio
+async def test_refresh_parses_off_the_event_loop(runner, csv_path, monkeypatch):
+    runner.load_csv(csv_path, "s")
+    append_rows(csv_path, 101, 5)
+    threads = {}
+    read_appended = server._CsvTail.read_appended
+
+    def recording_read_appended(tail):
+        threads["parse"] = threading.current_thread()
+        return read_appended(tail)
+
+    monkeypatch.setattr(server._CsvTail, "read_appended", recording_read_appended)
+    await runner.refresh_csv_async("s")
+
+    assert threads["parse"] is not threading.main_thread()
+    assert len(runner.data["s"]) == 105
+
+
+def test_truncated_last_line_with_selected_columns(runner, csv_path):
+    with open(csv_path, "a") as f:
+        f.write("101,2")
+    runner.load_csv(csv_path, "s", columns=["id", "department"])
+    assert runner.data["s"]["id"].tolist()[-1] == 101
+
+    with open(csv_path, "a") as f:
+        f.write("0,75.0,CS\n102,20,75.0,Math")
+    runner.refresh_csv("s")
+
+    df = runner.data["s"]
+    assert df["id"].tolist()[-3:] == [100, 101, 102]
+    assert df["department"].tolist()[-2:] == ["CS", "Math"]
@@ -0,0 +1,45 @@
+import pandas as pd
+
+from mcp_server_ds.server import _projection, _read_parquet, _row_filter_to_filters
+
+
+def test_comparisons_joined_by_and_become_filters():
+    assert _row_filter_to_filters("Department == 'CS' and Age > 20") == [("Department", "==", "CS"), ("Age", ">", 20)]
+
+
+def test_flipped_operands_are_turned_around():
+    assert _row_filter_to_filters("20 < Age") == [("Age", ">", 20)]
+    assert _row_filter_to_filters("'CS' == Department") == [("Department", "==", "CS")]
+
+
+def test_membership_tests():
+    assert _row_filter_to_filters("Grade in ['A', 'B']") == [("Grade", "in", ["A", "B"])]
+    assert _row_filter_to_filters("Grade not in ('F',)") == [("Grade", "not in", ["F"])]
+    assert _row_filter_to_filters("Grade in 'A'") is None
+
+
+def test_backticked_column_names():
+    assert _row_filter_to_filters("`Final Score` >= 50") == [("Final Score", ">=", 50)]
+    assert _projection(["id"], "`Final Score` >= 50") == ["id", "Final Score"]
+
+
+def test_other_expressions_fall_back_to_query():
+    for row_filter in ("Age > 20 or Age < 10", "Age > Score", "10 < Age < 20", "Age.isna()", "Age >"):
+        assert _row_filter_to_filters(row_filter) is None
+
+
+def test_parquet_filter_falls_back_to_query(tmp_path):
+    path = str(tmp_path / "data.parquet")
+    pd.DataFrame({"a": [1, 5, 10], "b": [2, 1, 3]}).to_parquet(path)
+
+    assert _read_parquet(path, row_filter="a > b")["a"].tolist() == [5, 10]
+    assert _read_parquet(path, columns=["b"], row_filter="a in [1, 10]").to_dict("list") == {"b": [2, 3]}
+
+
+def test_csv_engines_filter_alike(runner, csv_path):
+    runner.load_csv(csv_path, "c", row_filter="department in ['CS', 'Math'] and age > 20", columns=["id"])
+    runner.load_csv(csv_path, "arrow", row_filter="department in ['CS', 'Math'] and age > 20", columns=["id"],
+                    engine="pyarrow")
+
+    assert runner.data["c"]["id"].tolist() == runner.data["arrow"]["id"].tolist()
+    assert list(runner.data["c"].columns) == ["id"] and len(runner.data["c"]) == 35
@@ -0,0 +1,67 @@
+import pandas as pd
+
+from mcp_server_ds.server import _random_sample, _stratified_quotas
+
+
+def chunks_of(df, size):
+    return iter([df.iloc[start:start + size] for start in range(0, len(df), size)])
+
+
+def rows(count):
+    return pd.DataFrame({"id": range(count), "group": ["a"] * (count - count // 10 - 1) + ["b"] * (count // 10) + ["c"]})
+
+
+def test_quotas_are_proportional_and_add_up():
+    quotas = _stratified_quotas(pd.Series({"a": 600, "b": 300, "c": 100}), 10)
+
+    assert quotas.to_dict() == {"a": 6, "b": 3, "c": 1}
+
+
+def test_every_stratum_gets_at_least_one_row():
+    quotas = _stratified_quotas(pd.Series({"a": 9_990, "b": 5, "c": 5}), 10)
+
+    assert quotas["b"] == 1 and quotas["c"] == 1
+    assert quotas.sum() == 10
+
+
+def test_more_strata_than_rows_keeps_one_row_each():
+    quotas = _stratified_quotas(pd.Series({"a": 100, "b": 1, "c": 1, "d": 1}), 2)
+
+    assert quotas.to_dict() == {"a": 1, "b": 1, "c": 1, "d": 1}
+
+
+def test_quotas_do_not_exceed_the_rows_of_a_stratum():
+    quotas = _stratified_quotas(pd.Series({"a": 2, "b": 1}), 10)
+
+    assert quotas.to_dict() == {"a": 2, "b": 1}
+
+
+def test_reservoir_sample_is_reproducible_and_in_file_order():
+    df = rows(1_000)
+    first, seen = _random_sample(chunks_of(df, 64), 50)
+    second, _ = _random_sample(chunks_of(df, 100), 50)
+
+    assert seen == 1_000 and len(first) == 50
+    assert first["id"].is_monotonic_increasing
+    # the same rows whatever the chunk size, as each row's random key depends only on its position
+    assert first["id"].tolist() == second["id"].tolist()
+
+
+def test_stratified_sample_keeps_every_stratum():
+    df = rows(1_000)
+    sample, seen = _random_sample(chunks_of(df, 128), 20, stratify_by="group")
+
+    assert seen == 1_000
+    assert sample["group"].value_counts().to_dict() == {"a": 17, "b": 2, "c": 1}
+    assert sample["id"].isin(df["id"]).all()
+
+
+def test_sampled_load_is_reproducible(runner, csv_path):
+    runner.load_csv(csv_path, "first", sample=10, sample_method="reservoir")
+    runner.load_csv(csv_path, "second", sample=10, sample_method="reservoir", use_cache=False)
+    runner.load_csv(csv_path, "stratified", sample=8, sample_method="stratified", stratify_by="department")
+
+    assert runner.data["first"].equals(runner.data["second"])
+    assert runner.data["stratified"]["department"].value_counts().to_dict() == {
+        "Biology": 2, "CS": 2, "Math": 2, "Physics": 2
+    }
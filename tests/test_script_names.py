@@ -0,0 +1,15 @@
+def test_script_gets_only_the_dataframes_it_names(runner, csv_path):
+    runner.load_csv(csv_path, "s")
+    runner.load_csv(csv_path, "other")
+
+    assert runner.script_datasets("print(len(s))") == ["s"]
+    assert runner.script_datasets("print(locals()['other'])") == ["s", "other"]
+
+
+def test_dir_lists_the_loaded_dataframes(runner, csv_path):
+    runner.load_csv(csv_path, "s")
+    runner.load_csv(csv_path, "other")
+
+    result = runner.safe_eval("print(sorted(dir()))")
+
+    assert "['other', 's']" in result[0].text
@@ -0,0 +1,95 @@
+import time
+
+import anyio
+import pytest
+from mcp.shared.exceptions import McpError
+from mcp.shared.memory import create_connected_server_and_client_session
+from mcp.types import CancelledNotification, CancelledNotificationParams, ClientNotification
+
+from mcp_server_ds import server
+from mcp_server_ds.server import DataExplorationTools, ScriptRunner, create_server
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_requests_are_answered_while_a_script_runs(runner):
+    async with create_connected_server_and_client_session(create_server(runner)) as client:
+        finished = {}
+
+        async def run_script():
+            await client.call_tool(DataExplorationTools.RUN_SCRIPT, {"script": "import time; time.sleep(2)"})
+            finished["script"] = time.monotonic()
+
+        async with anyio.create_task_group() as tg:
+            started = time.monotonic()
+            tg.start_soon(run_script)
+            await anyio.sleep(0.2)
+            await client.list_tools()
+            finished["list_tools"] = time.monotonic()
+
+    assert finished["list_tools"] - started < 1
+    assert finished["script"] > finished["list_tools"]
+
+
+async def test_scripts_run_concurrently():
+    runner = ScriptRunner(max_workers=2)
+    try:
+        async with create_connected_server_and_client_session(create_server(runner)) as client:
+            async def run_script():
+                result = await client.call_tool(DataExplorationTools.RUN_SCRIPT, {"script": "import time; time.sleep(1)"})
+                assert not result.isError
+
+            started = time.monotonic()
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(run_script)
+                tg.start_soon(run_script)
+            assert time.monotonic() - started < 1.8
+    finally:
+        runner.shutdown()
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+async def test_cancelled_request_stops_the_script(executor, csv_path, tmp_path):
+    runner = ScriptRunner(executor=executor)
+    runner.load_csv(csv_path, "s")
+    before = runner.data["s"]
+    marker = tmp_path / "finished"
+    script = f"import time\nfor _ in range(40): time.sleep(0.05)\nopen({str(marker)!r}, 'w').close()\ns = s.head(1)"
+    try:
+        async with create_connected_server_and_client_session(create_server(runner)) as client:
+            async def run_script():
+                with pytest.raises(McpError):
+                    await client.call_tool(DataExplorationTools.RUN_SCRIPT, {"script": script, "save_to_memory": ["s"]})
+
+            request_id = client._request_id
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(run_script)
+                await anyio.sleep(0.5)
+                await client.send_notification(ClientNotification(CancelledNotification(
+                    method="notifications/cancelled", params=CancelledNotificationParams(requestId=request_id)
+                )))
+        await anyio.sleep(2.5)
+    finally:
+        runner.shutdown()
+
+    assert "Script cancelled" in runner.notes
+    assert not marker.exists()
+    assert runner.data["s"] is before
+
+
+async def test_load_progress_notifications_carry_rows_and_throughput(runner, csv_path, monkeypatch):
+    monkeypatch.setattr(server, "PROGRESS_INTERVAL", 0)
+    messages = []
+
+    async def on_progress(progress, total, message):
+        messages.append(message)
+
+    async with create_connected_server_and_client_session(create_server(runner)) as client:
+        result = await client.call_tool(
+            DataExplorationTools.LOAD_CSV, {"csv_path": csv_path, "use_cache": False}, progress_callback=on_progress
+        )
+        await anyio.sleep(0.1)
+
+    assert not result.isError
+    assert messages and all("rows parsed" in message for message in messages)
+    assert messages[-1].startswith("100 rows parsed in")
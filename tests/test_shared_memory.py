@@ -0,0 +1,60 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from mcp_server_ds import server
+from mcp_server_ds.server import ScriptRunner
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def process_runner(csv_path):
+    runner = ScriptRunner(executor="process", max_workers=2)
+    runner.load_csv(csv_path, "s")
+    yield runner
+    runner.shutdown()
+
+
+async def test_frames_are_published_once_off_the_event_loop(process_runner, monkeypatch):
+    copies = []
+
+    class SlowSharedFrame(server._SharedFrame):
+        def __init__(self, df):
+            copies.append(threading.current_thread())
+            time.sleep(0.5)
+            super().__init__(df)
+
+    monkeypatch.setattr(server, "_SharedFrame", SlowSharedFrame)
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.05)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    results = await asyncio.gather(
+        process_runner.safe_eval_async("print(len(s))"),
+        process_runner.safe_eval_async("print(s.age.max())"),
+    )
+    ticker.cancel()
+
+    assert [result[0].text for result in results] == ["print out result: 100\n", "print out result: 27\n"]
+    assert copies == [copies[0]] and copies[0] is not threading.main_thread()
+    assert ticks >= 5
+
+
+async def test_replaced_frames_are_released(process_runner):
+    await process_runner.safe_eval_async("print(len(s))")
+    first = process_runner._shared["s"]
+    await process_runner.safe_eval_async("s = s.head(10)", ["s"])
+    await process_runner.safe_eval_async("print(len(s))")
+
+    assert process_runner._shared["s"] is not first
+    assert first.closed and not process_runner._retired
+    with pytest.raises(FileNotFoundError):
+        server.shared_memory.SharedMemory(name=first.shm.name)